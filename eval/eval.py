@@ -75,6 +75,15 @@
 
     $ python eval.py -n 10 -r
 
+    To measure the recall of GreynirCorrect when sentences are only
+    parsed if the grammar check triage finds cues for at least one
+    grammar error code (cf. the triage option of GreynirCorrect),
+    compare the results with those of a run without the options.
+    Without --triage-skip-open, all sentences are parsed as long as
+    codes that the triage cannot predict are enabled:
+
+    $ python eval.py -m --triage 1 --triage-skip-open
+
 """
 
 from typing import Dict, List, Optional, Union, Tuple, Iterable, cast, NamedTuple, Any, DefaultDict
@@ -816,10 +825,55 @@ parser.add_argument(
     help="output individual sentences as well as results, even for the test corpus",
 )
 
+parser.add_argument(
+    "-t",
+    "--triage",
+    type=int,
+    default=None,
+    help=(
+        "only parse sentences with cues for at least this many grammar error codes; "
+        "no sentence is skipped unless --triage-skip-open is also given, "
+        "since the default codes include codes that the triage cannot predict"
+    ),
+)
+
+parser.add_argument(
+    "--triage-skip-open",
+    default=False,
+    action="store_true",
+    help="let the triage disregard grammar error codes that it cannot predict",
+)
+
 # This boolean global is set to True for quiet output,
 # which is the default when processing the test corpus
 QUIET = False
 
+# The triage threshold, or None to parse all sentences
+TRIAGE: Optional[int] = None
+# True if the triage disregards the codes that it cannot predict
+TRIAGE_SKIP_OPEN = False
+
+# The checking session of this process
+_SESSION: Optional[gc.CheckerSession] = None
+
+
+def session() -> gc.CheckerSession:
+    """ Return the checking session of this process, creating it
+        with the triage threshold if necessary """
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = gc.CheckerSession(triage=TRIAGE, triage_skip_open=TRIAGE_SKIP_OPEN)
+    return _SESSION
+
+
+def init_process(triage: Optional[int], triage_skip_open: bool) -> None:
+    """ Initialize a child process of the multiprocessing pool with
+        the triage settings, which are otherwise only inherited by
+        child processes that are forked """
+    global TRIAGE, TRIAGE_SKIP_OPEN
+    TRIAGE = triage
+    TRIAGE_SKIP_OPEN = triage_skip_open
+
 
 def element_text(element: ET.Element) -> str:
     """ Return the text of the given element,
@@ -1440,7 +1494,7 @@ def process(fpath_and_category: Tuple[str, str],) -> Dict[str, Any]:
                 continue
             
             # Pass it to GreynirCorrect
-            pg = [list(p) for p in gc.check(text)]
+            pg = [list(p) for p in session().check(text)]
             s: Optional[_Sentence] = None
             if len(pg) >= 1 and len(pg[0]) >= 1:
                 s = pg[0][0]
@@ -1663,7 +1717,11 @@ def main() -> None:
                 break
 
     # Use a multiprocessing pool to process the articles
-    with multiprocessing.Pool(processes=args.cores) as pool:
+    with multiprocessing.Pool(
+        processes=args.cores,
+        initializer=init_process,
+        initargs=(args.triage, args.triage_skip_open),
+    ) as pool:
         # Iterate through the TEI XML files in turn and call the process()
         # function on each file, in a child process within the pool
         for result in pool.imap_unordered(process, gen_files()):
@@ -35,18 +35,28 @@ from .settings import Settings
 # Token-level correction
 from .errtokenizer import (
     CorrectionPipeline,
+    CIOnlyPipeline,
     tokenize,
+    tokenize_ci,
     detokenize,
     Correct_TOK,
+    CodeSet,
+    TokenRule,
+    TokenRuleEngine,
+    RuleError,
 )
 
 # Grammar checking
 from .checker import (
     GreynirCorrect,
+    CheckerSession,
+    CheckerPool,
     check,
     check_single,
     check_with_stats,
     check_with_custom_parser,
+    check_parallel,
+    check_threaded,
 )
 
 # Annotations
@@ -39,18 +39,46 @@ class Annotation:
 
     """ An annotation of a span of a token list for a sentence """
 
+    __slots__ = (
+        "_start",
+        "_end",
+        "_code",
+        "_text",
+        "_detail",
+        "_suggest",
+        "_start_char",
+        "_end_char",
+    )
+
     def __init__(
-        self, *, start, end, code, text, detail=None, suggest=None, is_warning=False
+        self,
+        *,
+        start,
+        end,
+        code,
+        text,
+        detail=None,
+        suggest=None,
+        is_warning=False,
+        start_char=None,
+        end_char=None
     ):
         assert isinstance(start, int)
         assert isinstance(end, int)
         self._start = start
         self._end = end
+        # start_char and end_char are the offsets of the annotated span
+        # within the original text, from its first character to just past
+        # its last one, or None if not known
+        self._start_char = start_char
+        self._end_char = end_char
         if is_warning and not code.endswith("/w"):
             code += "/w"
         self._code = code
         # text is a short, straight-to-the-point human-readable description
-        # of the error
+        # of the error. It may also be given as a callable that takes no
+        # arguments and returns the description, in which case it is only
+        # rendered when the text property is first accessed.
         self._text = text
         # detail is a more detailed human-readable description of the error,
         # containing further explanations, eventually using grammatical terms,
@@ -63,10 +91,21 @@ class Annotation:
         # it before displaying it.
         self._suggest = suggest
 
+    def __getstate__(self):
+        """ Return the state of this annotation for pickling, rendering
+            a lazily specified description first """
+        self._text = self.text
+        return {a: getattr(self, a) for a in self.__slots__}
+
+    def __setstate__(self, state):
+        """ Restore the state of an unpickled annotation """
+        for a, v in state.items():
+            setattr(self, a, v)
+
     def __str__(self):
         """ Return a string representation of this annotation """
         return "{0:03}-{1:03}: {2:6} {3}{4}".format(
-            self._start, self._end, self._code, self._text,
+            self._start, self._end, self._code, self.text,
             "" if self._suggest is None else " / [" + self._suggest + "]"
         )
 
@@ -80,6 +119,29 @@ class Annotation:
         """ The index of the last token to which the annotation applies """
         return self._end
 
+    @property
+    def start_char(self):
+        """ The offset of the first character of the annotated span
+            within the original text, or None if not known """
+        return self._start_char
+
+    @property
+    def end_char(self):
+        """ The offset just past the last character of the annotated span
+            within the original text, or None if not known """
+        return self._end_char
+
+    def shift(self, offset):
+        """ Shift the token span of the annotation by the given offset,
+            i.e. when mapping it from a part of a sentence to the whole """
+        self._start += offset
+        self._end += offset
+
+    def set_char_span(self, start_char, end_char):
+        """ Set the character offsets of the annotated span """
+        self._start_char = start_char
+        self._end_char = end_char
+
     @property
     def code(self):
         """ A code for the annotation type, usually an error or warning code """
@@ -99,6 +161,9 @@ class Annotation:
     @property
     def text(self):
         """ A description of the annotation """
+        if callable(self._text):
+            # Render a lazily specified description, once
+            self._text = self._text()
         return self._text
 
     @property
@@ -44,30 +44,112 @@
     E002: A nonterminal tagged with 'error' is present in the parse tree
     E003: An impersonal verb occurs with an incorrect subject case
     E004: The sentence is probably not in Icelandic
+    E005: Parsing the sentence exceeded its time budget or reduction cap
 
 """
 
-from typing import cast, Iterable, Iterator, List, Tuple, Dict, Type, Optional
+from typing import (
+    TYPE_CHECKING, cast, Any, Iterable, Iterator, List, Tuple, Dict, Type, Optional,
+    Union, Callable,
+)
 
-from threading import Lock
+import time
+from functools import partial
+from threading import Lock, local
+from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor
 
+from tokenizer import tokenize as tokenize_raw
 from reynir import (
-    Greynir, correct_spaces, TOK, Tok, TokenList,
+    Greynir, correct_spaces, mark_paragraphs, TOK, Tok, TokenList,
     _Job, _Sentence, _Paragraph,
     ProgressFunc, ParseResult, ICELANDIC_RATIO,
 )
+from reynir.bindb import BIN_Db
 from reynir.binparser import BIN_Token, BIN_Grammar
 from reynir.bintokenizer import StringIterable
-from reynir.fastparser import Fast_Parser, ParseForestNavigator, ffi
+from reynir.fastparser import (
+    Fast_Parser, ParseForestNavigator, ParseError, ffi
+)
 from reynir.reducer import Reducer
 from reynir.settings import VerbSubjects
 
 from .annotation import Annotation
 from .errtokenizer import (
-    CorrectToken, tokenize as tokenize_and_correct
+    CorrectToken, CodeSet, tokenize as tokenize_and_correct
 )
 from .errfinder import ErrorFinder
 from .pattern import PatternMatcher
+from .triage import GrammarTriage
+
+if TYPE_CHECKING:
+    from .spelling import Corrector
+
+
+# The codes that can only be generated after parsing a sentence
+PARSE_CODES = ("E001", "E005") + ErrorFinder.CODES + PatternMatcher.CODES
+# The codes of sentence-level checks, including E004 which is made
+# on the tokens of the sentence without parsing it
+GRAMMAR_CODES = ("E004",) + PARSE_CODES
+CodeSet.PROFILES["grammar"] = GRAMMAR_CODES
+
+# The types of the codes argument of the checking functions, cf. CodeSet
+Codes = Union[None, str, Iterable[str], CodeSet]
+
+# A span of text to be checked by a worker process in CheckerPool:
+# the index of its paragraph, and its start and end offsets
+TextChunk = Tuple[int, int, int]
+
+# A sentence checked by a worker process: the sentence, dumped to JSON,
+# and its annotations
+CheckedSentence = Tuple[str, List[Annotation]]
+
+
+# The state of the parse in progress in each thread, cf. _LimitedParser
+_parse_state = local()
+
+
+class ParseLimitError(ParseError):
+
+    """ Base class for errors raised when the parse of a sentence
+        is abandoned since it exceeds a resource limit """
+
+    pass
+
+
+class ParseTimeoutError(ParseLimitError):
+
+    """ Raised when parsing a sentence exceeds its time budget,
+        cf. the parse_timeout option of GreynirCorrect """
+
+    pass
+
+
+class LongSentenceError(ParseError):
+
+    """ Raised instead of parsing a sentence that is longer than the
+        chunking threshold, cf. the chunk_tokens option of GreynirCorrect """
+
+    pass
+
+
+class TriageSkipError(ParseError):
+
+    """ Raised instead of parsing a sentence that the triage finds unlikely
+        to give rise to grammar annotations, cf. the triage option of
+        GreynirCorrect """
+
+    pass
+
+
+class ReductionCapError(ParseLimitError):
+
+    """ Raised instead of reducing a parse forest that has more combinations
+        than allowed, cf. the reduction_cap option of GreynirCorrect """
+
+    def __init__(self, txt: str, combinations: int) -> None:
+        super().__init__(txt, token_index=0)
+        self.combinations = combinations
 
 
 class ErrorDetectionToken(BIN_Token):
@@ -148,6 +230,29 @@ class ErrorDetectionToken(BIN_Token):
         )
 
 
+class _BudgetedToken(ErrorDetectionToken):
+
+    """ A token of a parse with a time budget, cf. _LimitedParser. When
+        the deadline of the parse has passed, the token matches no terminal,
+        so the parser gives up quickly. This only bounds the time spent
+        matching tokens: the time that the native parser spends after the
+        last match, and the time spent reducing the forest, are not
+        bounded, although the deadline is checked again before the
+        forest is passed on to the reducer. """
+
+    def __init__(self, t: Tok, original_index: int, deadline: float) -> None:
+        super().__init__(t, original_index)
+        self._deadline = deadline
+
+    def matches(self, terminal: Any) -> bool:
+        if time.monotonic() > self._deadline:
+            # The failed match ends up in the private matching cache
+            # of the parse, which is then discarded
+            _parse_state.expired = True
+            return False
+        return super().matches(terminal)
+
+
 class ErrorDetectingGrammar(BIN_Grammar):
 
     """ A subclass of BIN_Grammar that causes conditional sections in the
@@ -181,9 +286,227 @@ class ErrorDetectingParser(Fast_Parser):
 
     @staticmethod
     def _create_wrapped_token(t: Tok, ix: int) -> ErrorDetectionToken:
-        """ Create an instance of a wrapped token """
+        """ Create an instance of a wrapped token. The tokens of a parse
+            with a time budget check its deadline when they are matched. """
+        deadline: Optional[float] = getattr(_parse_state, "deadline", None)
+        if deadline is not None:
+            return _BudgetedToken(t, ix, deadline)
         return ErrorDetectionToken(t, ix)
 
+    @property
+    def _matching_cache(self) -> Dict[Any, Any]:
+        """ The token/terminal matching cache that Fast_Parser.go() passes
+            to the parse job. Parses with a time budget use a private cache
+            of their own, cf. _LimitedParser._go_timed(), while other parses
+            use the cache that is shared by all threads. """
+        private = getattr(_parse_state, "matching_cache", None)
+        return self._shared_matching_cache if private is None else private
+
+    @_matching_cache.setter
+    def _matching_cache(self, cache: Dict[Any, Any]) -> None:
+        self._shared_matching_cache = cache
+
+
+class _PrivateMatchingCache(dict):
+
+    """ The token/terminal matching cache of a parse with a time budget.
+        Since failed matches are recorded in the cache after the deadline,
+        the parse must not write to the cache shared by other parses.
+        Instead, the buffers of the shared cache are copied on first use,
+        and the buffers of a parse that finishes in time can be published
+        to the shared cache afterwards. """
+
+    def __init__(self, shared: Dict[Any, Any]) -> None:
+        super().__init__()
+        self._shared = shared
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        b = super().get(key)
+        if b is None:
+            s = self._shared.get(key)
+            if s is None:
+                return default
+            b = self[key] = ffi.new("BYTE[]", len(s))
+            ffi.memmove(b, s, len(s))
+        return b
+
+    def publish(self) -> None:
+        """ Add the buffers of tokens that are not in the
+            shared cache to it """
+        shared = self._shared
+        for key, b in self.items():
+            shared.setdefault(key, b)
+
+
+class _NullParser:
+
+    """ A stand-in for the parser when sentences are not to be parsed,
+        i.e. if GreynirCorrect is created with parse=False or none of the
+        codes that require parsing are enabled. It parses nothing, so
+        sentences are checked at the token level only and the grammar
+        is never loaded. """
+
+    def go(self, tokens: TokenList, root: Optional[str] = None) -> None:
+        return None
+
+
+# Coordinating conjunctions that can start a clause following a comma
+CLAUSE_CONJUNCTIONS = frozenset(("og", "en", "eða", "heldur", "enda", "né"))
+
+
+def clause_chunks(tokens: TokenList, max_tokens: int) -> List[Tuple[int, int]]:
+    """ Split the tokens of a sentence into chunks at clause boundaries,
+        i.e. at semicolons, colons and commas followed by a coordinating
+        conjunction, returning a list of (start, end) token index pairs.
+        Chunks are made as long as possible, but no longer than max_tokens
+        unless there is no boundary to split at. The punctuation at the
+        boundaries is not included in the chunks. """
+    n = len(tokens)
+    boundaries = [
+        i
+        for i, t in enumerate(tokens)
+        if t.kind == TOK.PUNCTUATION
+        and (
+            t.txt in (";", ":")
+            or (
+                t.txt == ","
+                and i + 1 < n
+                and tokens[i + 1].txt.lower() in CLAUSE_CONJUNCTIONS
+            )
+        )
+    ]
+    chunks: List[Tuple[int, int]] = []
+    start = 0
+    prev: Optional[int] = None
+    for b in boundaries + [n]:
+        if b - start > max_tokens and prev is not None:
+            # Cut at the previous boundary
+            if prev > start:
+                chunks.append((start, prev))
+            start = prev + 1
+        prev = b
+    if start < n:
+        chunks.append((start, n))
+    return chunks
+
+
+class _LimitedParser:
+
+    """ A wrapper around the parser that abandons the parse of a sentence
+        if it takes longer than a given number of seconds, or if its parse
+        forest has more than a given number of combinations, the reduction
+        cap. Sentences longer than a given number of tokens, or rejected by
+        the triage function, are not parsed. Note that the parse is
+        abandoned by making token matching fail, cf. _BudgetedToken, so the
+        time that the native parser spends after the last token match is
+        not bounded. The deadline is checked again before the forest is
+        returned for reduction, but the reduction itself is not bounded.
+        The reduction cap is checked after the native parser has built the
+        whole forest, so it does not limit the time or memory used by the
+        parser, only the reduction of highly ambiguous forests. """
+
+    def __init__(
+        self,
+        parser: ErrorDetectingParser,
+        timeout: Optional[float] = None,
+        reduction_cap: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        triage: Optional[Callable[[TokenList], bool]] = None,
+    ) -> None:
+        self._parser = parser
+        self._timeout = timeout
+        self._reduction_cap = reduction_cap
+        self._max_tokens = max_tokens
+        self._triage = triage
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._parser, name)
+
+    def go(self, tokens: TokenList, root: Optional[str] = None) -> Any:
+        """ Parse the tokens, raising a ParseLimitError if a limit
+            is exceeded """
+        if self._triage is not None and not self._triage(tokens):
+            raise TriageSkipError("Sentence is not worth parsing", token_index=0)
+        if self._max_tokens is not None and len(tokens) > self._max_tokens:
+            # The sentence will be parsed in chunks instead
+            raise LongSentenceError(
+                "Sentence is longer than {0} tokens".format(self._max_tokens),
+                token_index=self._max_tokens,
+            )
+        deadline: Optional[float] = None
+        if self._timeout is None:
+            forest = self._parser.go(tokens, root=root)
+        else:
+            # The chunks of a sentence share the time budget of the
+            # sentence, cf. GreynirCorrect.parse_chunks()
+            deadline = getattr(_parse_state, "chunk_deadline", None)
+            if deadline is None:
+                deadline = time.monotonic() + self._timeout
+            forest = self._go_timed(tokens, root, deadline)
+        if self._reduction_cap is not None and forest is not None:
+            num = Fast_Parser.num_combinations(forest)
+            if num > self._reduction_cap:
+                raise ReductionCapError(
+                    "Parse forest has {0} combinations".format(num), num
+                )
+        if deadline is not None and time.monotonic() > deadline:
+            # Don't start reducing the forest after the deadline
+            raise self._timeout_error()
+        return forest
+
+    def _go_timed(self, tokens: TokenList, root: Optional[str], deadline: float) -> Any:
+        """ Parse the tokens, raising ParseTimeoutError if the parse
+            is not finished by the deadline """
+        if time.monotonic() > deadline:
+            # No time is left for this parse
+            raise self._timeout_error()
+        cache = _PrivateMatchingCache(getattr(self._parser, "_shared_matching_cache"))
+        _parse_state.deadline = deadline
+        _parse_state.expired = False
+        _parse_state.matching_cache = cache
+        error: Optional[ParseError] = None
+        try:
+            forest = self._parser.go(tokens, root=root)
+        except ParseError as e:
+            forest, error = None, e
+        finally:
+            _parse_state.deadline = None
+            _parse_state.matching_cache = None
+        if not _parse_state.expired and time.monotonic() <= deadline:
+            # No match failed on account of the deadline, so the
+            # matching results of the parse are valid for later parses
+            cache.publish()
+            if error is not None:
+                raise error
+            return forest
+        # The parse took too long: its matching cache, containing
+        # failed matches, is discarded
+        raise self._timeout_error()
+
+    def _timeout_error(self) -> ParseTimeoutError:
+        """ Return an error for a parse that exceeded the time budget """
+        return ParseTimeoutError(
+            "Parsing exceeded {0} seconds".format(self._timeout), token_index=0
+        )
+
+
+class _ThreadedJob(_Job):
+
+    """ A job whose sentences are parsed by a pool of threads, cf.
+        CheckerSession.check_threaded(). Its sentences are not annotated
+        when they are created, but after they have been parsed, and the
+        statistics of the parses are collected under a lock. """
+
+    def __init__(self, greynir: Greynir, tokens: Iterable[Tok]) -> None:
+        super().__init__(greynir, tokens, parse=False)
+        self._lock = Lock()
+
+    def _add_sentence(
+        self, s: TokenList, num: int, parse_time: float, reduce_time: float
+    ) -> None:
+        with self._lock:
+            super()._add_sentence(s, num, parse_time, reduce_time)
+
 
 class GreynirCorrect(Greynir):
 
@@ -195,15 +518,68 @@ class GreynirCorrect(Greynir):
     # parsing enviroments
     _parser: Optional[ErrorDetectingParser] = None
     _reducer = None
+    _triage: Optional[GrammarTriage] = None
     _lock = Lock()
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, **options: Any) -> None:
+        """ Tokenization and correction options, such as only_ci
+            or corrector, can be passed as keyword arguments. The codes
+            option selects the error codes to check for, cf. CodeSet.
+            If parse_timeout is given, the parse of a sentence is abandoned
+            after that many seconds, and the sentence is annotated with
+            E005 instead of the grammar annotations. The same applies if
+            reduction_cap is given and the parse forest of a sentence has
+            more combinations than that; the forest is then not reduced.
+            Note that the cap is checked after the forest has been built,
+            so it does not limit the parser itself.
+            If chunk_tokens is given, sentences longer than that are
+            split into chunks at clause boundaries, and the chunks are
+            parsed and annotated separately, cf. clause_chunks().
+            If triage is given, a sentence is only parsed if its tokens
+            contain cues for at least that many different grammar codes,
+            cf. GrammarTriage; other sentences get token-level annotations
+            only. Sentences are always parsed if any code that the triage
+            cannot predict is enabled, such as E001, unless triage_skip_open
+            is True.
+            If parse is False, sentences are not parsed at all: they are
+            annotated with token-level errors and E004 only, and neither
+            the parser nor the reducer is ever created. """
+        self._parse_timeout: Optional[float] = options.pop("parse_timeout", None)
+        self._reduction_cap: Optional[int] = options.pop("reduction_cap", None)
+        self._chunk_tokens: Optional[int] = options.pop("chunk_tokens", None)
+        self._triage_threshold: Optional[int] = options.pop("triage", None)
+        self._triage_skip_open: bool = options.pop("triage_skip_open", False)
+        self._codes = codes = CodeSet.of(options.get("codes"))
+        self._parse: bool = options.pop("parse", True) and codes.any_enabled(
+            PARSE_CODES
+        )
+        if codes.any_enabled(GRAMMAR_CODES):
+            # The token-level corrections are needed for a successful parse,
+            # so all correction stages are run, and the annotations are
+            # filtered afterwards
+            options["codes"] = None
+        else:
+            # Only run the correction stages of the enabled codes
+            options["codes"] = codes
+        super().__init__(**options)
+
+    @property
+    def codes(self) -> CodeSet:
+        """ Return the set of enabled error codes """
+        return self._codes
+
+    @property
+    def parses(self) -> bool:
+        """ Return True if sentences are parsed, or False if they are
+            only checked at the token level """
+        return self._parse
 
     def tokenize(self, text_or_gen: StringIterable) -> Iterator[Tok]:
         """ Use the correcting tokenizer instead of the normal one """
         # The CorrectToken class is a duck-typing implementation of Tok
-        return cast(Iterator[Tok], tokenize_and_correct(text_or_gen))
+        return cast(
+            Iterator[Tok], tokenize_and_correct(text_or_gen, **self._options)
+        )
 
     @staticmethod
     def _dump_token(tok: Tok) -> Tuple:
@@ -225,6 +601,9 @@ class GreynirCorrect(Greynir):
     @property
     def parser(self) -> Fast_Parser:
         """ Override the parent class' construction of a parser instance """
+        if not self._parse:
+            # No grammar errors are to be checked: skip parsing altogether
+            return cast(Fast_Parser, _NullParser())
         with self._lock:
             if (
                 GreynirCorrect._parser is None
@@ -234,19 +613,90 @@ class GreynirCorrect(Greynir):
                 # Both classes are re-entrant and thread safe.
                 GreynirCorrect._parser = edp = ErrorDetectingParser()
                 GreynirCorrect._reducer = Reducer(edp.grammar)
-            return GreynirCorrect._parser
+                GreynirCorrect._triage = None
+                # Analyze the grammar for pruning the ErrorFinder traversal
+                ErrorFinder.set_grammar(edp.grammar)
+            parser = GreynirCorrect._parser
+            if self._triage_threshold is not None and GreynirCorrect._triage is None:
+                # The triage cues are collected from the parser's grammar
+                GreynirCorrect._triage = GrammarTriage(parser.grammar)
+            triage = GreynirCorrect._triage
+        if (
+            self._parse_timeout is not None
+            or self._reduction_cap is not None
+            or self._chunk_tokens is not None
+            or self._triage_threshold is not None
+        ):
+            return cast(
+                Fast_Parser,
+                _LimitedParser(
+                    parser,
+                    self._parse_timeout,
+                    self._reduction_cap,
+                    self._chunk_tokens,
+                    None
+                    if triage is None or self._triage_threshold is None
+                    else partial(
+                        triage.worth_parsing,
+                        codes=self._codes,
+                        threshold=self._triage_threshold,
+                        skip_open=self._triage_skip_open,
+                    ),
+                ),
+            )
+        return parser
 
     @property
     def reducer(self) -> Reducer:
         """ Return the reducer instance to be used """
+        if not self._parse:
+            # The null parser never creates a forest to be reduced
+            return cast(Reducer, None)
         # Should always retrieve the parser attribute first
         assert GreynirCorrect._reducer is not None
         return GreynirCorrect._reducer
 
+    @property
+    def parse_foreign_sentences(self) -> bool:
+        """ Foreign sentences are parsed if and only if E004 is disabled.
+            The grammar annotations of sentences that are annotated with
+            E004 are discarded anyway, while an unparsed sentence that is
+            not annotated with E004 would be annotated with E001. The foreign
+            sentence test is made on the tokens before parsing, cf.
+            _Job.parse(). The parse_foreign_sentences option is ignored. """
+        return not self._codes.enabled("E004")
+
+    @classmethod
+    def cleanup(cls) -> None:
+        """ Discard the memory resources held by the class. Unlike
+            Greynir.cleanup(), this discards the grammar of the error
+            detecting parser, leaving the plain Fast_Parser grammar
+            intact since it may still be in use by Greynir instances,
+            for instance when inflecting noun phrases. """
+        with cls._lock:
+            cls._reducer = None
+            cls._triage = None
+            ErrorFinder.set_grammar(None)
+            if cls._parser is not None:
+                ErrorDetectingParser.discard_grammar()
+                cls._parser.cleanup()
+                cls._parser = None
+
     @staticmethod
-    def annotate(sent: _Sentence) -> List[Annotation]:
+    def annotate(
+        sent: _Sentence,
+        codes: Optional[CodeSet] = None,
+        chunks: Optional[List[Tuple[int, _Sentence]]] = None,
+        parsed: bool = True,
+    ) -> List[Annotation]:
         """ Returns a list of annotations for a sentence object, containing
-            spelling and grammar annotations of that sentence """
+            spelling and grammar annotations of that sentence. If codes
+            is given, only annotations with enabled codes are returned.
+            chunks is a list of separately parsed chunks of the sentence,
+            along with their token offsets within it. If parsed is False,
+            no parse was attempted, and only the token-level annotations
+            and E004 are made. """
+        codes = codes or CodeSet()
         ann: List[Annotation] = []
         words_in_bin = 0
         words_not_in_bin = 0
@@ -268,17 +718,24 @@ class GreynirCorrect(Greynir):
             if hasattr(t, "error_code"):
                 assert isinstance(t, CorrectToken)
                 if t.error_code:
+                    # The error description is rendered lazily, i.e. only
+                    # if the annotation text is actually accessed
+                    err = t.error
                     ann.append(
                         Annotation(
                             start=ix,
                             end=ix + t.error_span - 1,
                             code=t.error_code,
-                            text=t.error_description,
+                            text=lambda err=err: err.description,
                         )
                     )
         # Then, look at the whole sentence
         num_words = words_in_bin + words_not_in_bin
-        if num_words > 2 and words_in_bin / num_words < ICELANDIC_RATIO:
+        if (
+            codes.enabled("E004")
+            and num_words > 2
+            and words_in_bin / num_words < ICELANDIC_RATIO
+        ):
             # The sentence contains less than 50% Icelandic
             # words: assume it's in a foreign language and discard the
             # token level annotations
@@ -293,75 +750,454 @@ class GreynirCorrect(Greynir):
                         .format(words_not_in_bin/num_words * 100.0)
                 )
             ]
+        elif not parsed or isinstance(sent.error, TriageSkipError):
+            # The sentence was not parsed: keep the token-level annotations
+            pass
+        elif chunks and any(chunk.deep_tree is not None for _, chunk in chunks):
+            # The sentence was parsed in chunks: annotate each parsed chunk
+            # and map the token indices back to the sentence
+            for offset, chunk in chunks:
+                if chunk.deep_tree is None:
+                    continue
+                chunk_ann: List[Annotation] = []
+                ErrorFinder(chunk_ann, chunk, codes).go()
+                PatternMatcher(chunk_ann, chunk, codes).go()
+                for a in chunk_ann:
+                    a.shift(offset)
+                ann.extend(chunk_ann)
+        elif isinstance(sent.error, ParseLimitError):
+            # The parse was abandoned: keep the token-level annotations
+            if codes.enabled("E005"):
+                if isinstance(sent.error, ParseTimeoutError):
+                    detail = "Þáttun málsgreinarinnar tók of langan tíma"
+                else:
+                    detail = "Málsgreinin er of margræð"
+                ann.append(
+                    # E005: Parsing the sentence exceeded its resource limits
+                    Annotation(
+                        start=0,
+                        end=len(sent.tokens) - 1,
+                        code="E005",
+                        text="Málsgreinin er of flókin til að hægt sé að yfirfara hana",
+                        detail=detail,
+                    )
+                )
         elif sent.deep_tree is None:
             # If the sentence couldn't be parsed,
             # put an annotation on it as a whole.
             # In this case, we keep the token-level annotations.
-            err_index = sent.err_index or 0
-            start = max(0, err_index - 1)
-            end = min(len(sent.tokens), err_index + 2)
-            toktext = correct_spaces(
-                " ".join(t.txt for t in sent.tokens[start:end] if t.txt)
-            )
-            ann.append(
-                # E001: Unable to parse sentence
-                Annotation(
-                    start=0,
-                    end=len(sent.tokens) - 1,
-                    code="E001",
-                    text="Málsgreinin fellur ekki að reglum",
-                    detail="Þáttun brást í kring um {0}. tóka ('{1}')"
-                        .format(err_index + 1, toktext)
+            if codes.enabled("E001"):
+                err_index = sent.err_index or 0
+                start = max(0, err_index - 1)
+                end = min(len(sent.tokens), err_index + 2)
+                toktext = correct_spaces(
+                    " ".join(t.txt for t in sent.tokens[start:end] if t.txt)
+                )
+                ann.append(
+                    # E001: Unable to parse sentence
+                    Annotation(
+                        start=0,
+                        end=len(sent.tokens) - 1,
+                        code="E001",
+                        text="Málsgreinin fellur ekki að reglum",
+                        detail="Þáttun brást í kring um {0}. tóka ('{1}')"
+                            .format(err_index + 1, toktext)
+                    )
                 )
-            )
         else:
             # Successfully parsed:
             # Add annotations for error-marked nonterminals from the grammar
             # found in the parse tree
-            ErrorFinder(ann, sent).go()
+            ErrorFinder(ann, sent, codes).go()
             # Run the pattern matcher on the sentence,
             # annotating questionable patterns
-            PatternMatcher(ann, sent).go()
+            PatternMatcher(ann, sent, codes).go()
+        if not codes.all:
+            # Remove annotations whose codes are not enabled
+            ann = [a for a in ann if codes.enabled(a.code)]
         # Sort the annotations by their start token index,
         # and then by decreasing span length
         ann.sort(key=lambda a: (a.start, -a.end))
+        # Add the character offsets of the annotated spans
+        # within the original text, as carried by the tokens
+        spans = [getattr(t, "origin", None) for t in sent.tokens]
+        for a in ann:
+            if a.start_char is None:
+                known = [sp for sp in spans[a.start : a.end + 1] if sp]
+                if known:
+                    a.set_char_span(known[0][0], known[-1][1])
         return ann
 
     def create_sentence(self, job: _Job, s: TokenList) -> _Sentence:
         """ Create a fresh sentence object and annotate it
             before returning it to the client """
         sent = super().create_sentence(job, s)
-        # Add spelling and grammar annotations to the sentence
-        setattr(sent, "annotations", self.annotate(sent))
+        if not isinstance(job, _ThreadedJob):
+            # Add spelling and grammar annotations to the sentence
+            self.annotate_sentence(sent)
         return sent
 
+    def annotate_sentence(self, sent: _Sentence) -> None:
+        """ Annotate a sentence, parsing it in chunks if it is
+            too long to be parsed as a whole """
+        chunks: Optional[List[Tuple[int, _Sentence]]] = None
+        if isinstance(sent.error, LongSentenceError) or (
+            self._parse
+            and self._chunk_tokens is not None
+            and not isinstance(sent.error, TriageSkipError)
+            and sent.combinations == 0
+            and len(sent.tokens) > self._chunk_tokens
+        ):
+            chunks = self.parse_chunks(sent)
+            setattr(sent, "chunks", [chunk for _, chunk in chunks])
+        setattr(
+            sent, "annotations", self.annotate(sent, self._codes, chunks, self._parse)
+        )
+
+    def parse_chunks(self, sent: _Sentence) -> List[Tuple[int, _Sentence]]:
+        """ Split a sentence into chunks at clause boundaries and parse each
+            chunk separately, returning the chunks with their offsets """
+        assert self._chunk_tokens is not None
+        tokens = sent.tokens
+        # The chunks are parsed within a separate job, so that
+        # they don't count as sentences in the job statistics
+        job = _Job(self, iter(()), parse=True)
+        if self._parse_timeout is not None:
+            # The chunks share the time budget of the sentence
+            _parse_state.chunk_deadline = time.monotonic() + self._parse_timeout
+        try:
+            return [
+                (start, _Sentence(job, tokens[start:end]))
+                for start, end in clause_chunks(tokens, self._chunk_tokens)
+            ]
+        finally:
+            _parse_state.chunk_deadline = None
+
+
+class CheckerSession:
+
+    """ A long-lived checking session that serves many calls. It holds
+        a GreynirCorrect instance, the BÍN database and a spelling Corrector,
+        with the Corrector's caches, and reuses them from one call to the
+        next instead of constructing them anew each time. The parser and
+        the n-gram model are shared singletons that are loaded on first use.
+        A session is confined to a single thread: use CheckerSession.get()
+        to obtain the default session of the calling thread. """
+
+    # Per-thread storage for the default sessions
+    _local = local()
+
+    def __init__(self, **options: Any) -> None:
+        """ Tokenization and correction options, as accepted by
+            GreynirCorrect, can be passed as keyword arguments """
+        from .spelling import Corrector
+
+        with BIN_Db.get_db() as db:
+            self._corrector: "Corrector" = Corrector(db)
+        self._options = options
+        self._rc = GreynirCorrect(corrector=self._corrector, **options)
+
+    @classmethod
+    def get(cls) -> "CheckerSession":
+        """ Return the default session of the calling thread,
+            creating it if necessary """
+        session: Optional[CheckerSession] = getattr(cls._local, "session", None)
+        if session is None:
+            session = cls._local.session = cls()
+        return session
+
+    @property
+    def corrector(self) -> "Corrector":
+        """ Return the Corrector instance of this session """
+        return self._corrector
+
+    @property
+    def greynir(self) -> GreynirCorrect:
+        """ Return the GreynirCorrect instance of this session """
+        return self._rc
+
+    def _greynir(self, codes: Codes, parse: bool=True) -> GreynirCorrect:
+        """ Return a GreynirCorrect instance that checks for the given
+            codes, sharing the Corrector of this session. If parse is
+            False, the instance only checks at the token level. """
+        if codes is None and (parse or not self._rc.parses):
+            return self._rc
+        options = dict(self._options)
+        if codes is not None:
+            options["codes"] = codes
+        if not parse:
+            options["parse"] = False
+        return GreynirCorrect(corrector=self._corrector, **options)
+
+    def tokenize(
+        self, text_or_gen: StringIterable, *, codes: Codes=None
+    ) -> Iterator[CorrectToken]:
+        """ Tokenize and correct text, returning a generator of tokens.
+            If codes is given, only the given error codes are checked,
+            cf. CodeSet. This applies to the other methods as well. """
+        rc = self._greynir(codes)
+        return cast(Iterator[CorrectToken], rc.tokenize(text_or_gen))
+
+    def check_single(
+        self, sentence_text: str, *, codes: Codes=None, parse: bool=True
+    ) -> Optional[_Sentence]:
+        """ Check and annotate a single sentence, given in plain text """
+        return self._greynir(codes, parse).parse_single(sentence_text)
+
+    def check(
+        self,
+        text: str,
+        *,
+        split_paragraphs: bool=False,
+        codes: Codes=None,
+        parse: bool=True
+    ) -> Iterable[_Paragraph]:
+        """ Return a generator of checked paragraphs of text,
+            each being a generator of checked sentences with
+            annotations. If parse is False, the sentences are not
+            parsed, and only token-level errors and E004 are annotated.
+            This applies to check_single() and check_with_stats() too. """
+        job = self._greynir(codes, parse).submit(
+            text, parse=True, split_paragraphs=split_paragraphs
+        )
+        yield from job.paragraphs()
+
+    def check_threaded(
+        self,
+        text: str,
+        *,
+        split_paragraphs: bool=False,
+        threads: Optional[int]=None,
+        codes: Codes=None
+    ) -> List[List[_Sentence]]:
+        """ Return a list of checked paragraphs of text, each being a list
+            of checked sentences with annotations. The sentences are parsed
+            by a pool of threads, so that the native parser, which releases
+            the GIL, can work on several sentences at once. Tokenization and
+            annotation are done in the calling thread, in document order.
+            threads is the maximum number of parsing threads. """
+        rc = self._greynir(codes)
+        if split_paragraphs:
+            text = mark_paragraphs(text)
+        # Tokenize the text and split it into sentences, without parsing
+        job = _ThreadedJob(rc, rc.tokenize(text))
+        paragraphs = [list(pg) for pg in job.paragraphs()]
+        sentences = [sent for pg in paragraphs for sent in pg]
+        with ThreadPoolExecutor(threads) as executor:
+            # The results of the parses are returned in document order
+            for sent, _ in zip(sentences, executor.map(_Sentence.parse, sentences)):
+                rc.annotate_sentence(sent)
+        return paragraphs
+
+    def check_with_stats(
+        self,
+        text: str,
+        *,
+        split_paragraphs: bool=False,
+        progress_func: ProgressFunc=None,
+        codes: Codes=None,
+        parse: bool=True
+    ) -> ParseResult:
+        """ Return a dict containing parsed paragraphs as well as statistics """
+        return _check_job(
+            self._greynir(codes, parse), text, split_paragraphs=split_paragraphs,
+            progress_func=progress_func
+        )
+
+
+def _text_chunks(text: str, max_sentences: int) -> Iterator[TextChunk]:
+    """ Split a text into chunks of consecutive sentences within the same
+        paragraph, using the plain tokenizer to find the sentence
+        boundaries, and yield the paragraph index and the character span
+        of each chunk """
+    para = 0
+    pos = 0
+    chunk_start: Optional[int] = None
+    chunk_end = 0
+    num_sentences = 0
+    for token in tokenize_raw(text):
+        original = token.original
+        if original:
+            if chunk_start is None and token.kind not in (TOK.P_BEGIN, TOK.P_END):
+                # Start a chunk at the first character of this token
+                chunk_start = pos + (token.origin_spans or [0])[0]
+            pos += len(original)
+        if token.kind == TOK.S_END and chunk_start is not None:
+            num_sentences += 1
+            chunk_end = pos
+            if num_sentences >= max_sentences:
+                yield para, chunk_start, chunk_end
+                chunk_start, num_sentences = None, 0
+        elif token.kind == TOK.P_END:
+            if chunk_start is not None and num_sentences:
+                yield para, chunk_start, chunk_end
+            chunk_start, num_sentences = None, 0
+            para += 1
+    if chunk_start is not None:
+        yield para, chunk_start, len(text)
+
+
+# The checking session of a CheckerPool worker process
+_worker_session: Optional[CheckerSession] = None
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """ Initialize a CheckerPool worker process """
+    global _worker_session
+    _worker_session = CheckerSession(**options)
+    # Load the grammar and create the parser up front
+    _worker_session.greynir.parser
+
+
+def _check_chunk(args: Tuple[str, int, Codes]) -> List[CheckedSentence]:
+    """ Check a chunk of text in a CheckerPool worker process """
+    text, offset, codes = args
+    assert _worker_session is not None
+    result: List[CheckedSentence] = []
+    for pg in _worker_session.check(text, codes=codes):
+        for sent in pg:
+            ann: List[Annotation] = getattr(sent, "annotations")
+            for a in ann:
+                # Make the character offsets relative to the entire text
+                if a.start_char is not None:
+                    a.set_char_span(a.start_char + offset, a.end_char + offset)
+            result.append((sent.dumps(GreynirCorrect), ann))
+    return result
 
-def check_single(sentence_text: str) -> Optional[_Sentence]:
-    """ Check and annotate a single sentence, given in plain text """
+
+class CheckerPool:
+
+    """ A pool of worker processes that check text in parallel. Each worker
+        holds a CheckerSession with a parser that is ready for use. The
+        sentences of a text are sent to the workers in chunks, and the
+        checked sentences are returned in document order. Use the pool
+        as a context manager, or call close() when done with it. """
+
+    # The default number of sentences in each chunk sent to a worker
+    CHUNK_SENTENCES = 8
+
+    def __init__(self, processes: Optional[int] = None, **options: Any) -> None:
+        """ processes is the number of worker processes, by default the
+            number of CPUs. Tokenization and correction options, as accepted
+            by GreynirCorrect, can be passed as keyword arguments. """
+        self._pool = Pool(processes, initializer=_init_worker, initargs=(options,))
+
+    def __enter__(self) -> "CheckerPool":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ Shut down the worker processes """
+        self._pool.close()
+        self._pool.join()
+
+    def check(
+        self,
+        text: str,
+        *,
+        split_paragraphs: bool=False,
+        codes: Codes=None,
+        chunk_sentences: int=CHUNK_SENTENCES
+    ) -> Iterator[List[_Sentence]]:
+        """ Return a generator of checked paragraphs of text, each being
+            a list of checked sentences with annotations. The sentences are
+            loaded from their dumped form, cf. Greynir.loads_single(), and
+            thus have a simplified tree but no deep tree. Paragraphs that
+            contain no sentences are not returned. """
+        if split_paragraphs:
+            # Mark the paragraphs, as GreynirCorrect.submit() would
+            text = mark_paragraphs(text)
+        chunks = list(_text_chunks(text, chunk_sentences))
+        results = self._pool.imap(
+            _check_chunk, [(text[start:end], start, codes) for _, start, end in chunks]
+        )
+        paragraph: List[_Sentence] = []
+        current = 0
+        for (para, _, _), checked in zip(chunks, results):
+            if para != current and paragraph:
+                yield paragraph
+                paragraph = []
+            current = para
+            for dumped, ann in checked:
+                sent = _Sentence.loads(GreynirCorrect, dumped)
+                setattr(sent, "annotations", ann)
+                paragraph.append(sent)
+        if paragraph:
+            yield paragraph
+
+
+def check_parallel(
+    text: str,
+    *,
+    split_paragraphs: bool=False,
+    processes: Optional[int]=None,
+    codes: Codes=None,
+    **options: Any
+) -> List[List[_Sentence]]:
+    """ Check a text using a pool of worker processes, returning a list
+        of checked paragraphs in document order, cf. CheckerPool. Options,
+        as accepted by GreynirCorrect, are passed on to the workers. Since
+        starting the workers takes a while, use a CheckerPool directly
+        to check many texts. """
+    with CheckerPool(processes, **options) as pool:
+        return list(pool.check(text, split_paragraphs=split_paragraphs, codes=codes))
+
+
+def check_single(
+    sentence_text: str, *, codes: Codes=None, parse: bool=True
+) -> Optional[_Sentence]:
+    """ Check and annotate a single sentence, given in plain text.
+        If codes is given, only the given error codes (or code prefixes,
+        or profiles such as "spelling" and "grammar") are checked.
+        If parse is False, the sentence is not parsed, and only
+        token-level errors and E004 are annotated. """
     # Returns None if no sentence was parsed
-    rc = GreynirCorrect()
-    return rc.parse_single(sentence_text)
+    return CheckerSession.get().check_single(
+        sentence_text, codes=codes, parse=parse
+    )
 
 
-def check(text: str, *, split_paragraphs: bool=False) -> Iterable[_Paragraph]:
+def check(
+    text: str,
+    *,
+    split_paragraphs: bool=False,
+    codes: Codes=None,
+    parse: bool=True
+) -> Iterable[_Paragraph]:
     """ Return a generator of checked paragraphs of text,
         each being a generator of checked sentences with
         annotations """
-    rc = GreynirCorrect()
     # This is an asynchronous (on-demand) parse job
-    job = rc.submit(text, parse=True, split_paragraphs=split_paragraphs)
-    yield from job.paragraphs()
+    return CheckerSession.get().check(
+        text, split_paragraphs=split_paragraphs, codes=codes, parse=parse
+    )
 
 
-def check_with_custom_parser(text: str, *,
+def check_threaded(
+    text: str,
+    *,
+    split_paragraphs: bool=False,
+    threads: Optional[int]=None,
+    codes: Codes=None
+) -> List[List[_Sentence]]:
+    """ Return a list of checked paragraphs of text, parsing the
+        sentences in a pool of threads, cf. CheckerSession.check_threaded() """
+    return CheckerSession.get().check_threaded(
+        text, split_paragraphs=split_paragraphs, threads=threads, codes=codes
+    )
+
+
+def _check_job(
+    rc: GreynirCorrect,
+    text: str,
+    *,
     split_paragraphs: bool=False,
-    parser_class: Type[GreynirCorrect]=GreynirCorrect,
     progress_func: ProgressFunc=None
 ) -> ParseResult:
-    """ Return a dict containing parsed paragraphs as well as statistics,
-        using the given correction/parser class. This is a low-level
-        function; normally check_with_stats() should be used. """
-    rc = parser_class()
+    """ Parse and check text with the given GreynirCorrect instance,
+        returning a dict containing parsed paragraphs and statistics """
     job = rc.submit(
         text,
         parse=True,
@@ -371,16 +1207,95 @@ def check_with_custom_parser(text: str, *,
     # Enumerating through the job's paragraphs and sentences causes them
     # to be parsed and their statistics collected
     paragraphs = [[sent for sent in pg] for pg in job.paragraphs()]
+    errors = [sent.error for pg in paragraphs for sent in pg]
+    foreign = [
+        sent
+        for pg in paragraphs
+        for sent in pg
+        if sent.combinations == 0
+        and any(a.code == "E004" for a in getattr(sent, "annotations"))
+    ]
+    num_foreign_tokens = sum(len(sent.tokens) for sent in foreign)
+    num_other_tokens = job.num_tokens - num_foreign_tokens
     return dict(
         paragraphs=paragraphs,
         num_sentences=job.num_sentences,
         num_parsed=job.num_parsed,
+        # Number of sentences whose parse exceeded the time budget
+        num_timeouts=sum(isinstance(e, ParseTimeoutError) for e in errors),
+        # Number of sentences whose parse forest exceeded the reduction cap
+        num_reduction_capped=sum(isinstance(e, ReductionCapError) for e in errors),
+        # Number of sentences that were not parsed because of the triage
+        num_triaged=sum(isinstance(e, TriageSkipError) for e in errors),
+        # Number of sentences that were found to be foreign before
+        # parsing and thus skipped the parser, and their total token count
+        num_foreign=len(foreign),
+        num_foreign_tokens=num_foreign_tokens,
+        # Estimate of the parse time saved by skipping the foreign sentences,
+        # assuming that they would have taken as long per token to parse
+        # as the other sentences of the text
+        foreign_parse_time_saved=(
+            job.parse_time * num_foreign_tokens / num_other_tokens
+            if num_other_tokens > 0
+            else 0.0
+        ),
+        # Number of long sentences that were parsed in chunks
+        num_chunked=sum(hasattr(sent, "chunks") for pg in paragraphs for sent in pg),
+        # The largest number of parse forest combinations of a sentence,
+        # including the forests that exceeded the reduction cap
+        peak_combinations=max(
+            [sent.combinations or 0 for pg in paragraphs for sent in pg]
+            + [e.combinations for e in errors if isinstance(e, ReductionCapError)],
+            default=0,
+        ),
         num_tokens=job.num_tokens,
         ambiguity=job.ambiguity,
         parse_time=job.parse_time,
     )
 
 
-def check_with_stats(text: str, *, split_paragraphs: bool=False) -> Dict:
+def check_with_custom_parser(text: str, *,
+    split_paragraphs: bool=False,
+    parser_class: Type[GreynirCorrect]=GreynirCorrect,
+    progress_func: ProgressFunc=None,
+    codes: Codes=None,
+    parse: bool=True
+) -> ParseResult:
+    """ Return a dict containing parsed paragraphs as well as statistics,
+        using the given correction/parser class. This is a low-level
+        function; normally check_with_stats() should be used. """
+    if parser_class is GreynirCorrect:
+        # Use the default session of the calling thread
+        return CheckerSession.get().check_with_stats(
+            text,
+            split_paragraphs=split_paragraphs,
+            progress_func=progress_func,
+            codes=codes,
+            parse=parse,
+        )
+    # Only pass the options that differ from their defaults, so that
+    # subclasses whose constructors take no arguments keep working
+    options: Dict[str, Any] = dict()
+    if codes is not None:
+        options["codes"] = codes
+    if not parse:
+        options["parse"] = False
+    return _check_job(
+        parser_class(**options),
+        text,
+        split_paragraphs=split_paragraphs,
+        progress_func=progress_func,
+    )
+
+
+def check_with_stats(
+    text: str,
+    *,
+    split_paragraphs: bool=False,
+    codes: Codes=None,
+    parse: bool=True
+) -> Dict:
     """ Return a dict containing parsed paragraphs as well as statistics """
-    return check_with_custom_parser(text, split_paragraphs=split_paragraphs)
+    return check_with_custom_parser(
+        text, split_paragraphs=split_paragraphs, codes=codes, parse=parse
+    )
@@ -38,18 +38,22 @@
 
 """
 
-from typing import Tuple, List, Dict, Any, Callable, Union, Optional, cast
+from typing import (
+    Tuple, List, Dict, Set, FrozenSet, Any, Callable, Union, Optional, cast
+)
 from typing_extensions import Protocol
 
 import re
+from collections import defaultdict
 
 from reynir import correct_spaces, TOK, _Sentence
 from reynir.fastparser import ParseForestNavigator, Node
+from reynir.grammar import Grammar, Nonterminal
 from reynir.settings import VerbSubjects
 from reynir.simpletree import SimpleTree
 
 from .annotation import Annotation
-from .errtokenizer import emulate_case
+from .errtokenizer import emulate_case, CodeSet
 
 
 # Typing stuff
@@ -58,6 +62,10 @@ AnnotationTuple2 = Tuple[str, str]
 AnnotationTuple4 = Tuple[str, int, int, str]
 AnnotationReturn = Union[str, AnnotationTuple2, AnnotationTuple4, AnnotationDict]
 AnnotationFunc = Callable[[str, str, Node], AnnotationReturn]
+# The handler of an error-tagged nonterminal: its error code, whether the
+# annotation is a warning, the name of the nonterminal without variants,
+# its variants, and its text function, if any
+Handler = Tuple[str, bool, str, str, Optional[Callable[..., AnnotationReturn]]]
 
 
 class CastFunction(Protocol):
@@ -138,8 +146,27 @@ class ErrorFinder(ParseForestNavigator):
         ),
     }
 
-    def __init__(self, ann: List[Annotation], sent: _Sentence) -> None:
+    # All error codes (or code prefixes) that ErrorFinder can generate
+    CODES = ("P_NT_", "P_WRONG_CASE_", "P_WRONG_OP_FORM", "X_number4word")
+    _VERB_CODES = ("P_WRONG_CASE_", "P_WRONG_OP_FORM")
+
+    # The analysis of the grammar that parse trees are derived from,
+    # cf. set_grammar()
+    _GRAMMAR_MAP: Optional["ErrorGrammarMap"] = None
+
+    def __init__(
+        self, ann: List[Annotation], sent: _Sentence, codes: Optional[CodeSet] = None
+    ) -> None:
         super().__init__(visit_all=True)
+        # The enabled error codes
+        self._codes = codes = codes or CodeSet()
+        # Skip the handlers of disabled codes
+        self._check_verbs = codes.any_enabled(self._VERB_CODES)
+        self._check_nonterminals = codes.any_enabled(("P_NT_",))
+        # The grammar analysis, if available, and the indices of the
+        # nonterminals whose subtrees need to be visited
+        self._map = self._GRAMMAR_MAP
+        self._visit: Optional[FrozenSet[int]] = None
         # Annotation list
         self._ann = ann
         # The original sentence object
@@ -149,9 +176,42 @@ class ErrorFinder(ParseForestNavigator):
         # Terminal node list
         self._terminal_nodes = sent.terminal_nodes
 
+    @classmethod
+    def set_grammar(cls, grammar: Optional[Grammar]) -> None:
+        """ Analyze the grammar that the parse trees to be checked are
+            derived from, allowing subtrees that cannot contain anything
+            to annotate to be skipped, cf. ErrorGrammarMap """
+        cls._GRAMMAR_MAP = None if grammar is None else ErrorGrammarMap(grammar)
+
+    @classmethod
+    def handler(cls, name: str) -> Handler:
+        """ Return the handler of the error-tagged nonterminal
+            with the given name """
+        variants = ""
+        if "_" in name:
+            # Separate the variants
+            name, variants = name.split("_", 1)
+        return (
+            cls.nonterminal_code(name),
+            name.startswith("Aðvörun"),
+            name,
+            variants,
+            # Find the text function by dynamic dispatch
+            getattr(cls, name, None),
+        )
+
     def go(self):
         """ Start navigating the deep tree structure of the sentence """
-        return super().go(self._sent.deep_tree)
+        if not (self._check_verbs or self._check_nonterminals):
+            return None
+        root = self._sent.deep_tree
+        gmap = self._map
+        if gmap is not None and root is not None and gmap.includes(root.nonterminal):
+            self._visit = gmap.visit_set(self._check_nonterminals, self._check_verbs)
+        else:
+            # The tree is not derived from the analyzed grammar
+            self._map = None
+        return super().go(root)
 
     @staticmethod
     def _node_span(node: Node) -> Tuple[int, int]:
@@ -735,10 +795,25 @@ class ErrorFinder(ParseForestNavigator):
             # Yes, this appears to be an erroneous subject case
             annotate_wrong_subject_case(subj_case_abbr, errors[subj_case_abbr])
 
+    @staticmethod
+    def nonterminal_code(name: str) -> str:
+        """ Return the error code of an error-tagged nonterminal """
+        # The error code is P_NT_ + the name of the error-tagged nonterminal
+        # without its variants, and after cutting 'Villa'/'Aðvörun' from
+        # its front
+        name = name.split("_", 1)[0]
+        if name.startswith("Aðvörun"):
+            # Warning
+            return "P_NT_" + name[7:]
+        if name.startswith("Villa"):
+            # Error
+            return "P_NT_" + name[5:]
+        return "P_NT_" + name
+
     def visit_token(self, level: int, node: Node) -> None:
         """ Entering a terminal/token match node """
         terminal = node.terminal
-        if terminal.category == "so":
+        if terminal.category == "so" and self._check_verbs:
             self._annotate_verb(node)
         # TODO: The following actually reduces GreynirCorrect's score on the
         # iceErrorCorpus test set, so we comment it out for the time being.
@@ -747,13 +822,28 @@ class ErrorFinder(ParseForestNavigator):
 
     def visit_nonterminal(self, level: int, node: Node) -> Any:
         """ Entering a nonterminal node """
-        if node.is_interior or node.nonterminal.is_optional:
+        nt = node.nonterminal
+        if self._visit is not None and nt.index not in self._visit:
+            # Neither an error-tagged nonterminal nor a verb can be
+            # derived from this node: skip its subtree
+            return NotImplemented
+        if node.is_interior or nt.is_optional:
             # Not an interesting node
             return None
-        if not node.nonterminal.has_tag("error"):
+        if not self._check_nonterminals:
+            return None
+        handler: Optional[Handler]
+        if self._map is not None:
+            handler = self._map.handlers.get(nt.index)
+        else:
+            handler = self.handler(nt.name) if nt.has_tag("error") else None
+        if handler is None:
             return None
         # This node has a nonterminal that is tagged with $tag(error)
         # in the grammar file (Greynir.grammar)
+        code, is_warning, name, variants, text_func = handler
+        if not self._codes.enabled(code):
+            return None
         suggestion = None
         ann_text = None
         ann_detail = None
@@ -761,30 +851,9 @@ class ErrorFinder(ParseForestNavigator):
         span_text = self._node_text(node)
         # See if we have a custom text function for this
         # error-tagged nonterminal
-        name = node.nonterminal.name
-        variants = ""
-        if "_" in name:
-            # Separate the variants
-            ix = name.index("_")
-            variants = name[ix + 1 :]
-            name = name[:ix]
-        # Find the text function by dynamic dispatch
-        text_func: Optional[AnnotationFunc] = getattr(self, name, None)
-        # The error code in this case is P_NT_ + the name of the error-tagged
-        # nonterminal, however after cutting 'Villa'/'Aðvörun' from its front
-        is_warning = False
-        if name.startswith("Aðvörun"):
-            # Warning
-            code = "P_NT_" + name[7:]
-            is_warning = True
-        elif name.startswith("Villa"):
-            # Error
-            code = "P_NT_" + name[5:]
-        else:
-            code = "P_NT_" + name
         if text_func is not None:
             # Yes: call it with the nonterminal's spanned text as argument
-            ann = text_func(span_text, variants, node)
+            ann = text_func(self, span_text, variants, node)
             if isinstance(ann, str):
                 ann_text = ann
             elif isinstance(ann, tuple):
@@ -804,7 +873,7 @@ class ErrorFinder(ParseForestNavigator):
         else:
             # No: use a default text
             ann_text = "'{0}' er líklega rangt".format(span_text)
-            ann_detail = "Regla {0}".format(node.nonterminal.name)
+            ann_detail = "Regla {0}".format(nt.name)
         self._ann.append(
             # P_NT_ + nonterminal name: Probable grammatical error.
             Annotation(
@@ -819,3 +888,62 @@ class ErrorFinder(ParseForestNavigator):
         )
         return None
 
+
+class ErrorGrammarMap:
+
+    """ An analysis of the grammar that the parse trees checked by
+        ErrorFinder are derived from. It holds a dispatch table of the
+        handlers of the error-tagged nonterminals, and the indices of
+        the nonterminals from which an error-tagged nonterminal or
+        a verb (so) terminal can be derived, all keyed by nonterminal
+        index. """
+
+    def __init__(self, grammar: Grammar) -> None:
+        self._grammar = grammar
+        # The nonterminals whose productions include each nonterminal
+        parents: Dict[Nonterminal, Set[Nonterminal]] = defaultdict(set)
+        errors: Set[Nonterminal] = set()
+        verbs: Set[Nonterminal] = set()
+        for nt, prods in grammar.nt_dict.items():
+            if nt.has_tag("error"):
+                errors.add(nt)
+            for _, prod in prods:
+                for sym in prod:
+                    if isinstance(sym, Nonterminal):
+                        parents[sym].add(nt)
+                    elif getattr(sym, "category", None) == "so":
+                        verbs.add(nt)
+        self.handlers: Dict[int, Handler] = {
+            nt.index: ErrorFinder.handler(nt.name) for nt in errors
+        }
+        to_errors = self._ancestors(errors, parents)
+        to_verbs = self._ancestors(verbs, parents)
+        self._visit_sets = {
+            (True, False): to_errors,
+            (False, True): to_verbs,
+            (True, True): to_errors | to_verbs,
+        }
+
+    @staticmethod
+    def _ancestors(
+        nts: Set[Nonterminal], parents: Dict[Nonterminal, Set[Nonterminal]]
+    ) -> FrozenSet[int]:
+        """ Return the indices of the given nonterminals and of all
+            nonterminals from which they can be derived """
+        found = set(nts)
+        stack = list(nts)
+        while stack:
+            for parent in parents.get(stack.pop(), ()):
+                if parent not in found:
+                    found.add(parent)
+                    stack.append(parent)
+        return frozenset(nt.index for nt in found)
+
+    def includes(self, nt: Nonterminal) -> bool:
+        """ Return True if the nonterminal belongs to the analyzed grammar """
+        return self._grammar.nonterminals_by_ix.get(nt.index) is nt
+
+    def visit_set(self, nonterminals: bool, verbs: bool) -> FrozenSet[int]:
+        """ Return the indices of the nonterminals whose subtrees may
+            contain error-tagged nonterminals and/or verbs, as requested """
+        return self._visit_sets[(nonterminals, verbs)]
@@ -35,6 +35,7 @@
 """
 
 from typing import (
+    TYPE_CHECKING,
     cast,
     Any,
     Type,
@@ -45,18 +46,27 @@ from typing import (
     Iterable,
     Iterator,
     Optional,
-    Type,
+    Set,
+    FrozenSet,
+    Callable,
+    Deque,
 )
 
 import re
-from collections import defaultdict
+import sys
+import warnings
+from threading import Lock, local
+from functools import partial, lru_cache
+from collections import defaultdict, deque
 from abc import ABC, abstractmethod
+from weakref import ReferenceType, WeakKeyDictionary, WeakValueDictionary, ref
 
 from tokenizer import Abbreviations, detokenize
 from reynir import TOK, Tok
 from reynir.bintokenizer import (
     DefaultPipeline,
     MatchingStream,
+    annotate,
     load_token,
     BIN_Db,
     Bin_TOK,
@@ -78,12 +88,24 @@ from .settings import (
     Morphemes,
     Settings,
 )
-from .spelling import Corrector
+
+if TYPE_CHECKING:
+    # The spelling module imports icegrams, which is only loaded
+    # when context-dependent spelling correction is actually needed
+    from .spelling import Corrector
 
 
 # Token constructor classes
 TokenCtor = Type["Correct_TOK"]
 
+# A sentence-level pipeline stage takes a list of the tokens of a sentence
+# and returns the (possibly modified) list, cf. run_batch_stages()
+TokenBatch = List["CorrectToken"]
+BatchStage = Callable[[TokenBatch], TokenBatch]
+
+# The character span (start, end) of a token within the original text
+CharSpan = Tuple[int, int]
+
 # Words that contain any letter from the following set are assumed
 # to be foreign and their spelling is not corrected, but suggestions are made
 NON_ICELANDIC_LETTERS_SET = frozenset("cwqøâãäçĉčêëîïñôõûüÿßĳ")
@@ -104,6 +126,12 @@ MONTH_NAMES_CAPITALIZED = (
     "Desember",
 )
 
+# Case names as encoded in the compressed BÍN file
+BIN_CASES = tuple(case.encode("latin-1") for case in ("NF", "ÞF", "ÞGF", "EF"))
+
+# Lock for building indices of word forms from BÍN
+_INDEX_LOCK = Lock()
+
 # Word categories and their names
 POS = {
     "lo": "lýsingarorð",
@@ -188,7 +216,7 @@ class CorrectToken:
     # Use __slots__ as a performance enhancement, since we want instances
     # to be as lightweight as possible - and we don't expect this class
     # to be subclassed or custom attributes to be added
-    __slots__ = ("kind", "txt", "val", "_err", "_cap")
+    __slots__ = ("kind", "txt", "val", "_err", "_cap", "_orig")
 
     def __init__(self, kind: int, txt: str, val: Union[None, Tuple, List]) -> None:
         self.kind = kind
@@ -199,6 +227,9 @@ class CorrectToken:
         # Capitalization state: indicates where this token appears in a sentence.
         # None or one of ("sentence_start", "after_ordinal", "in_sentence")
         self._cap: Optional[str] = None
+        # Character span (start, end) of the token within the original text,
+        # excluding preceding whitespace, or None if not known
+        self._orig: Optional[CharSpan] = None
 
     def __getitem__(self, index: int) -> Union[int, str, None, Tuple, List]:
         """ Support tuple-style indexing, as raw tokens do """
@@ -234,9 +265,9 @@ class CorrectToken:
             # Simple err field: return a 4-tuple
             return t + (err,)
         # This token has an associated error object:
-        # return a 5-tuple with the error class name and instance dict
+        # return a 5-tuple with the error class name and instance state
         # (which must be JSON serializable!)
-        return t + (err.__class__.__name__, err.__dict__)
+        return t + (err.__class__.__name__, err.state())
 
     @staticmethod
     def load(*args) -> "CorrectToken":
@@ -252,19 +283,15 @@ class CorrectToken:
         error_class_name = args[3]
         error_dict = args[4]
         error_cls = ERROR_CLASS_REGISTRY[error_class_name]
-        # Python hack to create a fresh, empty instance of the
-        # error class, then update its dict directly from the JSON data.
-        # Note that directly assigning __dict__ = error_dict causes
-        # a segfault on PyPy, hence the .update() call - which anyway
-        # feels cleaner.
-        instance = error_cls.__new__(error_cls)
-        instance.__dict__.update(error_dict)
-        ct.set_error(instance)
+        ct.set_error(error_cls.from_state(error_dict))
         return ct
 
     @classmethod
     def from_token(cls, token: Tok) -> "CorrectToken":
         """ Wrap a raw token in a CorrectToken """
+        if isinstance(token, CorrectToken):
+            # Already wrapped, cf. track_origins()
+            return token
         return cls(token.kind, token.txt, token.val)
 
     @classmethod
@@ -300,7 +327,8 @@ class CorrectToken:
 
     def set_error(self, err: Union[None, "Error", bool]) -> None:
         """ Associate an Error class instance with this token """
-        self._err = err
+        # Identical errors are shared between tokens, cf. Error.interned()
+        self._err = err.interned() if isinstance(err, Error) else err
 
     def copy_error(
         self, other: Union[List["CorrectToken"], "CorrectToken"], coalesce: bool = False
@@ -321,9 +349,41 @@ class CorrectToken:
                 # ('fimm hundruð' -> number token), so we reset
                 # the span to one token
                 assert isinstance(self._err, Error)
-                self._err.set_span(1)
+                self._err = self._err.with_span(1)
         return self._err is not None
 
+    def set_origin(self, start: int, end: int) -> None:
+        """ Set the character span of this token within the original text """
+        self._orig = (start, end)
+
+    def copy_origin(self, other: Union[List["CorrectToken"], "CorrectToken"]) -> None:
+        """ Copy the character span from another CorrectToken instance,
+            or cover the spans of a list of CorrectToken instances """
+        if isinstance(other, list):
+            spans = [t._orig for t in other if getattr(t, "_orig", None)]
+            if spans:
+                self._orig = (spans[0][0], spans[-1][1])
+        else:
+            self._orig = getattr(other, "_orig", None)
+
+    @property
+    def origin(self) -> Optional[CharSpan]:
+        """ Return the character span (start, end) of this token within
+            the original text, or None if not known """
+        return self._orig
+
+    @property
+    def char_start(self) -> Optional[int]:
+        """ Return the offset of the first character of this token
+            within the original text, or None if not known """
+        return None if self._orig is None else self._orig[0]
+
+    @property
+    def char_end(self) -> Optional[int]:
+        """ Return the offset just past the last character of this token
+            within the original text, or None if not known """
+        return None if self._orig is None else self._orig[1]
+
     @property
     def error(self) -> Union[None, "Error", bool]:
         """ Return the error object associated with this token, if any """
@@ -355,9 +415,20 @@ class Error(ABC):
 
     """ Base class for spelling and grammar errors, warnings and recommendations.
         An Error has a code and can provide a description of itself.
+        The description is stored as a message template along with
+        its arguments, and is only rendered when asked for.
         Note that Error instances (including subclass instances) are
         serialized to JSON and must therefore only contain serializable
-        attributes, in a plain __dict__. """
+        attributes, which are declared in __slots__. Errors are immutable
+        once they have been associated with a token, since identical
+        errors are then shared between tokens, cf. interned(). """
+
+    __slots__ = ("_code", "_span", "_args", "__weakref__")
+
+    # Shared instances of identical errors, keyed by class and state
+    _INTERNED: "WeakValueDictionary[Tuple[Any, ...], Error]" = WeakValueDictionary()
+    # The state attribute names of each Error subclass
+    _STATE_ATTRS: Dict[ErrorType, Tuple[str, ...]] = dict()
 
     def __init__(self, code: str, is_warning: bool = False, span: int = 1) -> None:
         # Note that if is_warning is True, "/w" is appended to
@@ -365,6 +436,71 @@ class Error(ABC):
         # a warning annotation instead of an error annotation.
         self._code = code + ("/w" if is_warning else "")
         self._span = span
+        # Arguments for the description template, if any
+        self._args: Tuple[Any, ...] = ()
+
+    @classmethod
+    def _state_attrs(cls) -> Tuple[str, ...]:
+        """ Return the names of the state attributes of this class,
+            i.e. the slots of the class and its base classes """
+        attrs = Error._STATE_ATTRS.get(cls)
+        if attrs is None:
+            attrs = tuple(
+                a
+                for c in reversed(cls.__mro__)
+                for a in c.__dict__.get("__slots__", ())
+                if a != "__weakref__"
+            )
+            Error._STATE_ATTRS[cls] = attrs
+        return attrs
+
+    def state(self) -> Dict[str, Any]:
+        """ Return the state of this error as a JSON-serializable dict """
+        return {a: getattr(self, a) for a in self._state_attrs()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Error":
+        """ Create an error instance from a state dict, as returned
+            by state() and possibly serialized to JSON and back """
+        instance = cls.__new__(cls)
+        # Instances dumped by older versions have no _args
+        instance._args = ()
+        for a, v in state.items():
+            # JSON turns tuples into lists
+            setattr(instance, a, tuple(v) if isinstance(v, list) else v)
+        return instance
+
+    def _key(self) -> Tuple[Any, ...]:
+        """ Return the key of this error in the table of shared instances """
+        return (self.__class__,) + tuple(getattr(self, a) for a in self._state_attrs())
+
+    def interned(self) -> "Error":
+        """ Return a shared instance of an error identical to this one """
+        try:
+            return Error._INTERNED.setdefault(self._key(), self)
+        except TypeError:
+            # Unhashable state: don't share this instance
+            return self
+
+    def with_span(self, span: int) -> "Error":
+        """ Return an error identical to this one, except for its span """
+        if span == self._span:
+            return self
+        state = self.state()
+        state["_span"] = span
+        return self.from_state(state).interned()
+
+    def set_span(self, span: int) -> "Error":
+        """ Deprecated: errors are shared between tokens and cannot be
+            modified, so this returns an error with the given span, as
+            with_span() does. Use token.set_error(error.with_span(span)). """
+        warnings.warn(
+            "Error.set_span() is deprecated; use "
+            "token.set_error(error.with_span(span)) instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return self.with_span(span)
 
     def __eq__(self, other: Any) -> bool:
         return (
@@ -386,9 +522,9 @@ class Error(ABC):
         """ Should be overridden """
         ...
 
-    def set_span(self, span: int) -> None:
-        """ Set the number of tokens spanned by this error """
-        self._span = span
+    def _render(self, txt: str) -> str:
+        """ Render a description template with this error's arguments """
+        return txt.format(*self._args) if self._args else txt
 
     @property
     def span(self) -> int:
@@ -412,18 +548,23 @@ class PunctuationError(Error):
 
     """ A PunctuationError is an error where punctuation is wrong """
 
+    __slots__ = ("_txt",)
+
     # N001: Wrong quotation marks
     # N002: Three periods should be an ellipsis
     # N003: Informal combination of punctuation (??!!)
 
-    def __init__(self, code: str, txt: str, span: int = 1) -> None:
+    def __init__(
+        self, code: str, txt: str, span: int = 1, args: Tuple[Any, ...] = ()
+    ) -> None:
         # Punctuation error codes start with "N"
         super().__init__("N" + code, span=span)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
 
 @register_error_class
@@ -432,6 +573,8 @@ class CompoundError(Error):
     """ A CompoundError is an error where words are duplicated, split or not
         split correctly. """
 
+    __slots__ = ("_txt",)
+
     # C001: Duplicated word removed. Should be corrected.
     # C002: Wrongly compounded words split up. Should be corrected.
     # C003: Wrongly split compounds united. Should be corrected.
@@ -440,16 +583,19 @@ class CompoundError(Error):
     # C005: Possible split compound, depends on meaning/PoS chosen by parser.
     # C006: A part of a word compound word is wrong.
 
-    def __init__(self, code: str, txt: str, span: int = 1) -> None:
+    def __init__(
+        self, code: str, txt: str, span: int = 1, args: Tuple[Any, ...] = ()
+    ) -> None:
         # Compound error codes start with "C"
         # We consider C004 to be a warning, not an error
         is_warning = code == "004"
         super().__init__("C" + code, is_warning=is_warning, span=span)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
 
 @register_error_class
@@ -459,16 +605,25 @@ class UnknownWordError(Error):
         exist in BÍN or additional vocabularies, and cannot be explained as
         a compound word. """
 
+    __slots__ = ("_txt",)
+
     # U001: Unknown word. Nothing more is known. Cannot be corrected, only pointed out.
 
-    def __init__(self, code: str, txt: str, is_warning: bool = False) -> None:
+    def __init__(
+        self,
+        code: str,
+        txt: str,
+        is_warning: bool = False,
+        args: Tuple[Any, ...] = (),
+    ) -> None:
         # Unknown word error codes start with "U"
         super().__init__("U" + code, is_warning=is_warning)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
 
 @register_error_class
@@ -479,20 +634,23 @@ class CapitalizationError(Error):
         except at the beginning of a sentence, or should be upper case
         but occurs in lower case. """
 
+    __slots__ = ("_txt",)
+
     # Z001: Word should begin with lowercase letter
     # Z002: Word should begin with uppercase letter
     # Z003: Month name should begin with lowercase letter
     # Z004: Numbers should be written in lowercase ('24 milljónir')
     # Z005: Amounts should be written in lowercase ('24 milljónir króna')
 
-    def __init__(self, code: str, txt: str) -> None:
+    def __init__(self, code: str, txt: str, args: Tuple[Any, ...] = ()) -> None:
         # Capitalization error codes start with "Z"
         super().__init__("Z" + code)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
 
 @register_error_class
@@ -501,16 +659,19 @@ class AbbreviationError(Error):
     """ An AbbreviationError is an error where an abbreviation
         is not spelled out, punctuated or spaced correctly. """
 
+    __slots__ = ("_txt",)
+
     # A001: Abbreviation corrected
 
-    def __init__(self, code: str, txt: str) -> None:
+    def __init__(self, code: str, txt: str, args: Tuple[Any, ...] = ()) -> None:
         # Abbreviation error codes start with "A"
         super().__init__("A" + code)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
 
 @register_error_class
@@ -519,16 +680,19 @@ class TabooWarning(Error):
     """ A TabooWarning marks a word that is vulgar or not appropriate
         in formal text. """
 
+    __slots__ = ("_txt",)
+
     # T001: Taboo word usage warning, with suggested replacement
 
-    def __init__(self, code: str, txt: str) -> None:
+    def __init__(self, code: str, txt: str, args: Tuple[Any, ...] = ()) -> None:
         # Taboo word warnings start with "T"
         super().__init__("T" + code, is_warning=True)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
 
 @register_error_class
@@ -537,6 +701,8 @@ class SpellingError(Error):
     """ A SpellingError is an erroneous word that was replaced
         by a much more likely word that exists in the dictionary. """
 
+    __slots__ = ("_txt",)
+
     # S001: Common errors picked up by unique_errors. Should be corrected
     # S002: Errors handled by spelling.py. Corrections should possibly
     #       only be suggested.
@@ -544,14 +710,15 @@ class SpellingError(Error):
     #       Should be corrected.
     # S004: Rare word, a more common one has been substituted.
 
-    def __init__(self, code: str, txt: str) -> None:
+    def __init__(self, code: str, txt: str, args: Tuple[Any, ...] = ()) -> None:
         # Spelling error codes start with "S"
         super().__init__("S" + code)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
 
 @register_error_class
@@ -560,17 +727,22 @@ class SpellingSuggestion(Error):
     """ A SpellingSuggestion is an annotation suggesting that
         a word might be misspelled. """
 
+    __slots__ = ("_txt", "_suggest")
+
     # W001: Replacement suggested
 
-    def __init__(self, code: str, txt: str, suggest: str) -> None:
+    def __init__(
+        self, code: str, txt: str, suggest: str, args: Tuple[Any, ...] = ()
+    ) -> None:
         # Spelling suggestion codes start with "W"
         super().__init__("W" + code, is_warning=True)
         self._txt = txt
+        self._args = args
         self._suggest = suggest
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
 
     @property
     def suggestion(self) -> str:
@@ -588,19 +760,534 @@ class PhraseError(Error):
     """ A PhraseError is a wrong multiword phrase, where a word is out
         of place in its context. """
 
+    __slots__ = ("_txt",)
+
     # P_xxx: Phrase error codes
 
     def __init__(
-        self, code: str, txt: str, span: int, is_warning: bool = False
+        self,
+        code: str,
+        txt: str,
+        span: int,
+        is_warning: bool = False,
+        args: Tuple[Any, ...] = (),
     ) -> None:
         # Phrase error codes start with "P", and are followed by
         # a string indicating the type of error, i.e. YI for y/i, etc.
         super().__init__("P_" + code, is_warning=is_warning, span=span)
         self._txt = txt
+        self._args = args
 
     @property
     def description(self) -> str:
-        return self._txt
+        return self._render(self._txt)
+
+
+@register_error_class
+class RuleError(Error):
+
+    """ A RuleError is an error or warning from a custom word-level
+        check, cf. TokenRule. Its code is given in full by the rule. """
+
+    __slots__ = ("_txt",)
+
+    def __init__(
+        self,
+        code: str,
+        txt: str,
+        args: Tuple[Any, ...] = (),
+        is_warning: bool = False,
+        span: int = 1,
+    ) -> None:
+        super().__init__(code, is_warning=is_warning, span=span)
+        self._txt = txt
+        self._args = args
+
+    @property
+    def description(self) -> str:
+        return self._render(self._txt)
+
+
+class CodeSet:
+
+    """ A selection of enabled error codes. Codes are given as prefixes,
+        for instance "S" enables all spelling errors (S001, S004...) and
+        "P_NT_" all grammar errors from error-tagged nonterminals. Names
+        of profiles, such as "spelling", may also be given. A CodeSet
+        created with codes=None enables all codes. Checking stages declare
+        the codes that they can emit and are skipped if none of those
+        codes are enabled, cf. any_enabled(). """
+
+    # Profiles of codes that can be enabled by name. The checker
+    # module adds a "grammar" profile.
+    PROFILES: Dict[str, Tuple[str, ...]] = {
+        # Token-level errors, as well as multiword phrase errors, cf. profile()
+        "spelling": ("A", "C", "N", "S", "T", "U", "W", "Z"),
+    }
+
+    def __init__(self, codes: Union[None, str, Iterable[str]] = None) -> None:
+        self._prefixes: Optional[Tuple[str, ...]] = None
+        if codes is not None:
+            if isinstance(codes, str):
+                codes = (codes,)
+            prefixes: Set[str] = set()
+            for code in codes:
+                if code in self.PROFILES:
+                    prefixes.update(self.profile(code))
+                else:
+                    prefixes.add(code)
+            self._prefixes = tuple(sorted(prefixes))
+        # Cached results of enabled()
+        self._enabled: Dict[str, bool] = dict()
+
+    @classmethod
+    def of(cls, codes: Union[None, str, Iterable[str], "CodeSet"]) -> "CodeSet":
+        """ Return a CodeSet for the given codes, which may already be one """
+        return codes if isinstance(codes, CodeSet) else cls(codes)
+
+    @classmethod
+    def profile(cls, name: str) -> Tuple[str, ...]:
+        """ Return the codes of the given profile """
+        codes = cls.PROFILES[name]
+        if name == "spelling":
+            codes += phrase_codes()
+        return codes
+
+    @property
+    def all(self) -> bool:
+        """ True if all codes are enabled """
+        return self._prefixes is None
+
+    def enabled(self, code: str) -> bool:
+        """ Return True if the given error or warning code is enabled """
+        if self._prefixes is None:
+            return True
+        result = self._enabled.get(code)
+        if result is None:
+            bare = code[:-2] if code.endswith("/w") else code
+            result = self._enabled[code] = bare.startswith(self._prefixes)
+        return result
+
+    def any_enabled(self, codes: Iterable[str]) -> bool:
+        """ Return True if any code starting with one of the given
+            prefixes may be enabled """
+        prefixes = self._prefixes
+        if prefixes is None:
+            return True
+        return any(
+            code.startswith(prefixes) or any(p.startswith(code) for p in prefixes)
+            for code in codes
+        )
+
+
+@lru_cache(maxsize=1)
+def phrase_codes() -> Tuple[str, ...]:
+    """ Return the codes of multiword phrase errors, cf. PhraseError """
+    return tuple(sorted(set("P_" + code for _, code, _ in MultiwordErrors.LIST)))
+
+
+# The code prefixes that each correction stage can emit
+PARSE_ERRORS_CODES = ("A", "C", "N", "S")
+COMPOUND_CODES = ("C",)
+CAPITALIZATION_CODES = ("Z",)
+UNKNOWN_WORD_CODES = ("S", "U", "W")
+TABOO_CODES = ("T",)
+
+
+def filter_errors(
+    token_stream: Iterable[CorrectToken], codes: CodeSet
+) -> Iterator[CorrectToken]:
+    """ Remove errors whose codes are not enabled from the tokens """
+    for token in token_stream:
+        err = token.error
+        if isinstance(err, Error) and not codes.enabled(err.code):
+            token.set_error(None)
+        yield token
+
+
+def sentence_batches(token_stream: Iterable[CorrectToken]) -> Iterator[TokenBatch]:
+    """ Group a token stream into lists of tokens, each ending with
+        a sentence end token. Tokens between sentences, such as paragraph
+        markers, are included in the list of the following sentence. """
+    batch: TokenBatch = []
+    for token in token_stream:
+        batch.append(token)
+        if token.kind == TOK.S_END:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def batch_adapter(
+    stage: Callable[[Iterable[CorrectToken]], Iterator[CorrectToken]]
+) -> BatchStage:
+    """ Adapt a token generator stage, taking a token stream and yielding
+        tokens, to the sentence-level stage protocol. Note that the
+        generator is restarted for each sentence, so any state that it
+        keeps between sentences is lost. """
+    return lambda batch: list(stage(batch))
+
+
+def run_batch_stages(
+    token_stream: Iterable[CorrectToken], stages: Iterable[BatchStage]
+) -> Iterator[CorrectToken]:
+    """ Run a sequence of sentence-level stages on a token stream.
+        Each stage processes all tokens of a sentence in one call,
+        and the tokens only pass through a single generator, no matter
+        how many stages there are. """
+    stages = list(stages)
+    for batch in sentence_batches(token_stream):
+        for stage in stages:
+            batch = stage(batch)
+        yield from batch
+
+
+# A token rule function is called with the tokens of a sentence and the
+# index of a token that triggered the rule. It returns an error to be
+# associated with that token, or None if the rule does not apply.
+TokenRuleFunc = Callable[[TokenBatch, int], Optional[Error]]
+
+
+class TokenRule:
+
+    """ A custom word-level check. A rule declares the word forms
+        (in lower case) and/or the lemmas that trigger it, and the
+        code of the errors that it can return. Its function is only
+        called for tokens that match a trigger, cf. TokenRuleEngine. """
+
+    __slots__ = ("code", "forms", "lemmas", "func")
+
+    def __init__(
+        self,
+        code: str,
+        func: TokenRuleFunc,
+        *,
+        forms: Iterable[str] = (),
+        lemmas: Iterable[str] = ()
+    ) -> None:
+        self.code = code
+        self.func = func
+        self.forms = frozenset(f.lower() for f in forms)
+        self.lemmas = frozenset(lemmas)
+        if not self.forms and not self.lemmas:
+            raise ValueError("Token rule {0} has no triggers".format(code))
+
+    def __repr__(self) -> str:
+        return "<TokenRule {0}>".format(self.code)
+
+
+class TokenRuleEngine:
+
+    """ Runs a collection of TokenRules on sentences. The engine keeps
+        an index from trigger word forms and lemmas to rules, so the cost
+        of checking a token does not grow with the number of rules: only
+        the rules triggered by the token are run. Rules are run in the
+        order in which they were added, and the first error returned for
+        a token is kept. Tokens that already have an error from an earlier
+        correction stage are left alone. """
+
+    def __init__(self, rules: Iterable[TokenRule] = ()) -> None:
+        self._forms: Dict[str, List[TokenRule]] = defaultdict(list)
+        self._lemmas: Dict[str, List[TokenRule]] = defaultdict(list)
+        # The rules, mapped to the order in which they were added
+        self._order: Dict[TokenRule, int] = dict()
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, rule: TokenRule) -> None:
+        """ Add a rule to the engine, indexing it by its triggers """
+        self._order.setdefault(rule, len(self._order))
+        for form in rule.forms:
+            self._forms[form].append(rule)
+        for lemma in rule.lemmas:
+            self._lemmas[lemma].append(rule)
+
+    def rule(
+        self, code: str, *, forms: Iterable[str] = (), lemmas: Iterable[str] = ()
+    ) -> Callable[[TokenRuleFunc], TokenRuleFunc]:
+        """ A decorator that adds a rule function to the engine """
+
+        def decorator(func: TokenRuleFunc) -> TokenRuleFunc:
+            self.add(TokenRule(code, func, forms=forms, lemmas=lemmas))
+            return func
+
+        return decorator
+
+    def triggered(self, token: CorrectToken) -> List[TokenRule]:
+        """ Return the rules triggered by the given token, in order """
+        rules = self._forms.get(token.txt.lower(), [])
+        if self._lemmas and token.val:
+            lemma_rules = [
+                rule
+                for lemma in {m.stofn for m in token.val}
+                for rule in self._lemmas.get(lemma, ())
+            ]
+            if lemma_rules:
+                order = self._order.__getitem__
+                rules = sorted(set(rules).union(lemma_rules), key=order)
+        return rules
+
+    def apply(self, tokens: TokenBatch, codes: Optional[CodeSet] = None) -> TokenBatch:
+        """ Run the triggered rules on the tokens of a sentence.
+            Rules whose codes are not enabled are skipped. """
+        for ix, token in enumerate(tokens):
+            if token.kind != TOK.WORD or token.error:
+                continue
+            for rule in self.triggered(token):
+                if codes is not None and not codes.enabled(rule.code):
+                    continue
+                err = rule.func(tokens, ix)
+                if err is not None:
+                    token.set_error(err)
+                    break
+        return tokens
+
+    def stage(self, codes: Optional[CodeSet] = None) -> BatchStage:
+        """ Return a sentence-level stage that runs the rules,
+            cf. run_batch_stages() """
+        return partial(self.apply, codes=codes)
+
+
+# Maximum number of interned BÍN lookup results kept in the cache
+MEANINGS_CACHE_SIZE = 8192
+
+# A BÍN lookup result: the word form and its list of meanings
+LookupResult = Tuple[str, List[BIN_Meaning]]
+
+
+def intern_meaning(m: BIN_Meaning) -> BIN_Meaning:
+    """ Return a BÍN meaning tuple with its strings interned """
+    return BIN_Meaning(
+        sys.intern(m.stofn),
+        m.utg,
+        sys.intern(m.ordfl),
+        sys.intern(m.fl),
+        sys.intern(m.ordmynd),
+        sys.intern(m.beyging),
+    )
+
+
+# A cached BÍN lookup function of a particular BIN_Db instance
+CachedLookup = Callable[[str, bool, bool], LookupResult]
+
+# The cached lookup functions, by BIN_Db instance
+_LOOKUP_CACHES: "WeakKeyDictionary[BIN_Db, CachedLookup]" = WeakKeyDictionary()
+
+
+def cached_lookup(db_ref: "ReferenceType[BIN_Db]") -> CachedLookup:
+    """ Return a cached lookup function for a BIN_Db instance. The function
+        only refers weakly to the instance, so that its cache does not
+        keep the instance alive. """
+
+    @lru_cache(maxsize=MEANINGS_CACHE_SIZE)
+    def lookup(w: str, at_sentence_start: bool, auto_uppercase: bool) -> LookupResult:
+        db = db_ref()
+        assert db is not None
+        w, m = db.lookup_word(w, at_sentence_start, auto_uppercase)
+        return sys.intern(w), [intern_meaning(mm) for mm in m]
+
+    return lookup
+
+
+def lookup_interned(
+    db: BIN_Db, w: str, at_sentence_start: bool = False, auto_uppercase: bool = False
+) -> LookupResult:
+    """ Look up a word form in BÍN, returning a result with interned
+        strings. Identical lookups return the same meaning list, which
+        is shared between all tokens having that form and must therefore
+        not be modified. """
+    lookup = _LOOKUP_CACHES.get(db)
+    if lookup is None:
+        lookup = _LOOKUP_CACHES.setdefault(db, cached_lookup(ref(db)))
+    return lookup(w, at_sentence_start, auto_uppercase)
+
+
+class InterningDb:
+
+    """ A proxy for a BIN_Db instance, returning interned
+        results from lookup_word(), cf. lookup_interned() """
+
+    __slots__ = ("_db",)
+
+    def __init__(self, db: BIN_Db) -> None:
+        self._db = db
+
+    def lookup_word(
+        self, w: str, at_sentence_start: bool = False, auto_uppercase: bool = False
+    ) -> LookupResult:
+        return lookup_interned(self._db, w, at_sentence_start, auto_uppercase)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._db, name)
+
+
+# The members of reynir's BIN_Compressed class used by inflected_forms()
+BIN_INTERNALS = ("_raw_lookup", "stem", "case_variants")
+
+
+def compressed_bin(db: BIN_Db) -> Any:
+    """ Return the BIN_Compressed instance of a BIN_Db instance, or None
+        if it is unavailable or lacks the internals that inflected_forms()
+        relies on. BIN_Db has no public API for listing all forms of a
+        stem, so these internals are used when present; other versions
+        of reynir may not have them. """
+    cb = getattr(db, "_compressed_bin", None)
+    if cb is None or not all(callable(getattr(cb, a, None)) for a in BIN_INTERNALS):
+        return None
+    return cb
+
+
+def inflected_forms(db: BIN_Db, lemma: str) -> Optional[Set[str]]:
+    """ Return the inflected forms of all BÍN stems having the given lemma.
+        Only stems that inflect by case (nouns, adjectives, pronouns, etc.)
+        have their forms listed in BÍN; verbs have none. If the lemma
+        is not found in BÍN, it is assumed to be a compound word, and
+        the forms of its longest suffix that is a BÍN lemma are returned,
+        with the rest of the lemma prepended. Returns None if the forms
+        cannot be listed, cf. compressed_bin(); the callers then fall
+        back to looking up each word. """
+    cb = compressed_bin(db)
+    if cb is None:
+        return None
+    for i in range(len(lemma) - 2):
+        prefix, tail = lemma[:i], lemma[i:]
+        stems = set(ix for ix, _ in cb._raw_lookup(tail) if cb.stem(ix)[0] == tail)
+        if stems:
+            return set(
+                prefix + form.decode("latin-1")
+                for ix in stems
+                for case in BIN_CASES
+                for form in cb.case_variants(ix, case=case)
+            )
+    return set()
+
+
+def split_compound_pairs(db: BIN_Db) -> FrozenSet[Tuple[str, str]]:
+    """ Return the set of (first part, second part form) pairs of split
+        compounds, generating it from BÍN on first use """
+    pairs = SplitCompounds.PAIRS
+    if pairs is None:
+        with _INDEX_LOCK:
+            pairs = SplitCompounds.PAIRS
+            if pairs is None:
+                p: Set[Tuple[str, str]] = set()
+                lookup_first: Set[str] = set()
+                forms: Dict[str, Set[str]] = dict()
+                for first_part, stems in SplitCompounds.DICT.items():
+                    for stem in stems:
+                        if stem not in forms:
+                            forms[stem] = inflected_forms(db, stem) or set()
+                        if not forms[stem]:
+                            # No forms in BÍN (for instance, adverbs), or
+                            # they cannot be listed: the second part must
+                            # be looked up
+                            lookup_first.add(first_part)
+                        p.update((first_part, form.lower()) for form in forms[stem])
+                SplitCompounds.LOOKUP_FIRST = frozenset(lookup_first)
+                pairs = SplitCompounds.PAIRS = frozenset(p)
+    return pairs
+
+
+def capitalization_forms(db: BIN_Db) -> Optional[FrozenSet[str]]:
+    """ Return the set of inflected forms of the reverse-capitalized
+        stems of [capitalization_errors], generating it from BÍN on first
+        use, or None if the forms cannot be listed """
+    forms = CapitalizationErrors.FORMS
+    if forms is None:
+        if compressed_bin(db) is None:
+            return None
+        with _INDEX_LOCK:
+            forms = CapitalizationErrors.FORMS
+            if forms is None:
+                f: Set[str] = set()
+                for stem in CapitalizationErrors.SET_REV:
+                    f.update(inflected_forms(db, stem) or ())
+                forms = CapitalizationErrors.FORMS = frozenset(f)
+    return forms
+
+
+class RuleIndex:
+
+    """ A compiled index of the word-level correction tables, keyed
+        by word form. Each entry is a bit mask of the rules that may
+        fire for the form, so that a word that is not in any table
+        costs a single dictionary lookup. Some rules are matched on
+        the lower case version of a word; these are only indexed
+        under lower case keys. The index is built on first use,
+        after the configuration has been read, and rebuilt if the
+        tables are modified later, cf. Settings.generation. """
+
+    # Rule flags
+    WRONG_ABBREV = 1  # WRONG_ABBREVS
+    WRONG_DOTS = 2  # Abbreviations.WRONGDOTS
+    UNIQUE_ERROR = 4  # UniqueErrors.DICT
+    CID_ERROR_FORM = 8  # CIDErrorForms.DICT, also in lower case
+    WRONG_COMPOUND = 16  # WrongCompounds.DICT, lower case
+    SPLIT_COMPOUND = 32  # SplitCompounds.DICT, lower case
+    BOUND_MORPHEME = 64  # Morphemes.BOUND_DICT, lower case
+
+    # Rules that also match the lower case version of a word
+    LOWER_CASE_RULES = (
+        CID_ERROR_FORM | WRONG_COMPOUND | SPLIT_COMPOUND | BOUND_MORPHEME
+    )
+
+    _DICT: Optional[Dict[str, int]] = None
+    # The Settings.generation that the index was built from
+    _generation = -1
+    _lock = Lock()
+
+    @classmethod
+    def _build(cls) -> Dict[str, int]:
+        """ Compile the index from the correction tables """
+        d: Dict[str, int] = defaultdict(int)
+
+        def add(keys: Iterable[str], flag: int, lower_case: bool = False) -> None:
+            for key in keys:
+                if not lower_case or key == key.lower():
+                    d[key] |= flag
+
+        # Make sure that the abbreviation tables have been read
+        Abbreviations.initialize()
+        add(WRONG_ABBREVS, cls.WRONG_ABBREV)
+        add(Abbreviations.WRONGDOTS, cls.WRONG_DOTS)
+        add(UniqueErrors.DICT, cls.UNIQUE_ERROR)
+        add(CIDErrorForms.DICT, cls.CID_ERROR_FORM)
+        add(WrongCompounds.DICT, cls.WRONG_COMPOUND, lower_case=True)
+        add(SplitCompounds.DICT, cls.SPLIT_COMPOUND, lower_case=True)
+        add(Morphemes.BOUND_DICT, cls.BOUND_MORPHEME, lower_case=True)
+        return dict(d)
+
+    @classmethod
+    def lookup(cls, txt: Optional[str]) -> int:
+        """ Return a bit mask of the rules that may apply to the given word form """
+        if not txt:
+            return 0
+        d = cls._DICT
+        if d is None or cls._generation != Settings.generation:
+            with cls._lock:
+                generation = Settings.generation
+                if cls._DICT is None or cls._generation != generation:
+                    cls._DICT = cls._build()
+                    cls._generation = generation
+                d = cls._DICT
+        rules = d.get(txt, 0)
+        lower = txt.lower()
+        if lower != txt:
+            rules |= d.get(lower, 0) & cls.LOWER_CASE_RULES
+        return rules
+
+    @classmethod
+    def reset(cls) -> None:
+        """ Discard the index, causing it to be rebuilt on next use.
+            Modifications of the tables in the settings module are
+            detected automatically, but this must be called if the
+            abbreviation tables are modified. """
+        with cls._lock:
+            cls._DICT = None
 
 
 def parse_errors(
@@ -669,22 +1356,26 @@ def parse_errors(
 
             # Make the lookahead checks we're interested in
 
+            # Find the word-level rules that may apply to this token
+            rules = RuleIndex.lookup(token.txt)
+
             # Check wrong abbreviations
             if (
                 not only_ci
+                and rules & RuleIndex.WRONG_ABBREV
                 and token.kind == TOK.WORD
                 and token.val
-                and token.txt in WRONG_ABBREVS
             ):
                 original = token.txt
                 corrected = WRONG_ABBREVS[original]
-                token = CorrectToken.word(corrected, token.val)
+                ct = CorrectToken.word(corrected, token.val)
+                ct.copy_origin(token)
+                token = ct
                 token.set_error(
                     AbbreviationError(
                         "001",
-                        "Skammstöfunin '{0}' var leiðrétt í '{1}'".format(
-                            original, corrected
-                        ),
+                        "Skammstöfunin '{0}' var leiðrétt í '{1}'",
+                        args=(original, corrected),
                     )
                 )
                 yield token
@@ -693,7 +1384,7 @@ def parse_errors(
                 continue
 
             # Check abbreviations with missing dots
-            if not token.val and token.txt in Abbreviations.WRONGDOTS:
+            if rules & RuleIndex.WRONG_DOTS and not token.val:
                 # Multiple periods in original, some subset missing here
                 # We suggest the first alternative meaning here, out of
                 # potentially multiple such meanings
@@ -715,13 +1406,14 @@ def parse_errors(
                         # as an abbreviation
                         am = Abbreviations.get_meaning(corrected)
                         m = list(map(BIN_Meaning._make, am))
-                        token = CorrectToken.word(corrected, m)
+                        ct = CorrectToken.word(corrected, m)
+                        ct.copy_origin(token)
+                        token = ct
                         token.set_error(
                             AbbreviationError(
                                 "002",
-                                "Skammstöfunin '{0}' var leiðrétt í '{1}'".format(
-                                    original, corrected
-                                ),
+                                "Skammstöfunin '{0}' var leiðrétt í '{1}'",
+                                args=(original, corrected),
                             )
                         )
                         yield token
@@ -743,17 +1435,21 @@ def parse_errors(
                     next_token.set_error(
                         CompoundError(
                             "004",
-                            "'{0}' er að öllum líkindum ofaukið".format(next_token.txt),
+                            "'{0}' er að öllum líkindum ofaukið",
+                            args=(next_token.txt,),
                         )
                     )
                     yield token
                 else:
-                    # Step to next token
-                    next_token = CorrectToken.word(token.txt)
+                    # Step to next token, which now covers both words
+                    ct = CorrectToken.word(token.txt)
+                    ct.copy_origin([token, next_token])
+                    next_token = ct
                     next_token.set_error(
                         CompoundError(
                             "001",
-                            "Endurtekið orð ('{0}') var fellt burt".format(token.txt),
+                            "Endurtekið orð ('{0}') var fellt burt",
+                            args=(token.txt,),
                         )
                     )
                 token = next_token
@@ -775,7 +1471,8 @@ def parse_errors(
                 next_token.set_error(
                     CompoundError(
                         "004",
-                        "'{0}' er að öllum líkindum ofaukið".format(next_token.txt),
+                        "'{0}' er að öllum líkindum ofaukið",
+                        args=(next_token.txt,),
                     )
                 )
                 yield token
@@ -785,7 +1482,7 @@ def parse_errors(
 
             # Splitting wrongly compounded words
             # TODO STILLING - hér er ósamhengisháð leiðrétting!
-            if token.txt and token.txt.lower() in WrongCompounds.DICT:
+            if rules & RuleIndex.WRONG_COMPOUND:
                 correct_phrase = list(WrongCompounds.DICT[token.txt.lower()])
                 # Make the split phrase emulate the case of
                 # the original token
@@ -798,11 +1495,14 @@ def parse_errors(
                     correct_phrase[0] = emulate_case(correct_phrase[0], token.txt)
                 for ix, phrase_part in enumerate(correct_phrase):
                     new_token = CorrectToken.word(phrase_part)
+                    # Each part refers to the entire original word
+                    new_token.copy_origin(token)
                     if ix == 0:
                         new_token.set_error(
                             CompoundError(
                                 "002",
-                                "Orðinu '{0}' var skipt upp".format(token.txt),
+                                "Orðinu '{0}' var skipt upp",
+                                args=(token.txt,),
                                 span=len(correct_phrase),
                             )
                         )
@@ -815,25 +1515,21 @@ def parse_errors(
             # TODO STILLING - ath. þó að e-ð af orðhlutunum í Morphemes.BOUND_DICT geta ekki staðið sjálfstæð
             # TODO STILLING - þá þarf að merkja þá orðhluta sem villu ef ósh. leiðrétting er valin.
             # Unite wrongly split compounds, or at least suggest uniting them
-            if token.txt and (
-                token.txt.lower() in SplitCompounds.DICT
-                or token.txt.lower() in Morphemes.BOUND_DICT
-            ):
+            if rules & (RuleIndex.SPLIT_COMPOUND | RuleIndex.BOUND_MORPHEME):
                 if only_ci:
-                    if token.txt.lower() in SplitCompounds.DICT:
+                    if rules & RuleIndex.SPLIT_COMPOUND:
                         # Don't want to correct
                         yield token
                         token = next_token
                         at_sentence_start = False
                         continue
-                    if token.txt.lower() in Morphemes.BOUND_DICT:
+                    if rules & RuleIndex.BOUND_MORPHEME:
                         # Only want to mark as an error, can't fix in CI-mode.
                         token.set_error(
                             SpellingError(
                                 "007",
-                                "Orðhlutinn '{0}' á ekki að standa stakur".format(
-                                    token.txt
-                                ),
+                                "Orðhlutinn '{0}' á ekki að standa stakur",
+                                args=(token.txt,),
                             )
                         )
                     yield token
@@ -859,37 +1555,53 @@ def parse_errors(
                     yield token
                     token = next_token
                     continue
-                next_stems = SplitCompounds.DICT.get(token.txt.lower())
+                first_part = token.txt.lower()
+                next_stems = SplitCompounds.DICT.get(first_part)
                 if not next_stems:
                     yield token
                     token = next_token
                     at_sentence_start = False
                     continue
-                _, meanings = db.lookup_word(
-                    next_token.txt.lower(), at_sentence_start=False
-                )
-                if not meanings:
-                    # The latter part is not in BÍN
+                next_lower = next_token.txt.lower()
+                if (first_part, next_lower) in split_compound_pairs(db):
+                    # The latter part is a form of one of the stems
+                    is_split = True
+                elif (
+                    first_part in SplitCompounds.LOOKUP_FIRST
+                    or rules & RuleIndex.BOUND_MORPHEME
+                ):
+                    _, meanings = db.lookup_word(next_lower, at_sentence_start=False)
+                    if not meanings:
+                        # The latter part is not in BÍN
+                        yield token
+                        token = next_token
+                        at_sentence_start = False
+                        continue
+                    is_split = first_part in SplitCompounds.LOOKUP_FIRST and any(
+                        m.stofn.replace("-", "") in next_stems for m in meanings
+                    )
+                else:
                     yield token
                     token = next_token
                     at_sentence_start = False
                     continue
-                if any(m.stofn.replace("-", "") in next_stems for m in meanings):
+                if is_split:
                     first_txt = token.txt
-                    token = CorrectToken.word(token.txt + next_token.txt)
+                    ct = CorrectToken.word(token.txt + next_token.txt)
+                    ct.copy_origin([token, next_token])
+                    token = ct
                     token.set_error(
                         CompoundError(
                             "003",
-                            "Orðin '{0} {1}' voru sameinuð í eitt".format(
-                                first_txt, next_token.txt
-                            ),
+                            "Orðin '{0} {1}' voru sameinuð í eitt",
+                            args=(first_txt, next_token.txt),
                         )
                     )
                     yield token
                     token = get()
                     at_sentence_start = False
                     continue
-                next_pos = Morphemes.BOUND_DICT.get(token.txt.lower())
+                next_pos = Morphemes.BOUND_DICT.get(first_part)
                 if not next_pos:
                     yield token
                     token = next_token
@@ -906,13 +1618,14 @@ def parse_errors(
                 if not notposes:
                     # No other PoS available, most likely a compound error
                     first_txt = token.txt
-                    token = CorrectToken.word(token.txt + next_token.txt)
+                    ct = CorrectToken.word(token.txt + next_token.txt)
+                    ct.copy_origin([token, next_token])
+                    token = ct
                     token.set_error(
                         CompoundError(
                             "003",
-                            "Orðin '{0} {1}' voru sameinuð í eitt".format(
-                                first_txt, next_token.txt
-                            ),
+                            "Orðin '{0} {1}' voru sameinuð í eitt",
+                            args=(first_txt, next_token.txt),
                         )
                     )
                     yield token
@@ -930,9 +1643,8 @@ def parse_errors(
                     token.set_error(
                         CompoundError(
                             "005",
-                            "Ef '{0}' er {1} á að sameina það '{2}'".format(
-                                token.txt, tp, next_token.txt
-                            ),
+                            "Ef '{0}' er {1} á að sameina það '{2}'",
+                            args=(token.txt, tp, next_token.txt),
                         )
                     )
                     yield token
@@ -951,9 +1663,8 @@ def parse_errors(
                     token.set_error(
                         PunctuationError(
                             "001",
-                            "Gæsalappirnar {0} ættu að vera {1}".format(
-                                token.txt, ntxt
-                            ),
+                            "Gæsalappirnar {0} ættu að vera {1}",
+                            args=(token.txt, ntxt),
                         )
                     )
                 elif ntxt == "…":
@@ -980,9 +1691,8 @@ def parse_errors(
                     token.set_error(
                         PunctuationError(
                             "003",
-                            "'{0}' er óformlegt, breytt í '{1}'".format(
-                                token.txt, ntxt
-                            ),
+                            "'{0}' er óformlegt, breytt í '{1}'",
+                            args=(token.txt, ntxt),
                         )
                     )
 
@@ -1018,24 +1728,35 @@ class MultiwordErrorStream(MatchingStream):
         """ This is a complete match of an error phrase;
             yield the replacement phrase """
         replacement = MultiwordErrors.get_replacement(ix)
-        db = self._db
         token_ctor = self._token_ctor
-        for i, replacement_word in enumerate(replacement):
+        # The BÍN meanings of the replacement phrase are looked up
+        # the first time the rule fires, and stored with the rule
+        lookups = MultiwordErrors.LOOKUPS.get(ix)
+        if lookups is None:
+            db = self._db
             # !!! TODO: at_sentence_start
-            w, m = db.lookup_word(replacement_word, False, False)
+            lookups = [lookup_interned(db, word) for word in replacement]
+            MultiwordErrors.LOOKUPS[ix] = lookups
+        for i, (w, m) in enumerate(lookups):
+            # Note that the meaning list is shared, cf. lookup_interned()
             if i == 0:
                 # Fix capitalization of the first word
                 # !!! TODO: handle all-uppercase
                 if tq[0].txt.istitle():
                     w = w.title()
             ct = cast(CorrectToken, token_ctor.Word(w, m))
+            if len(lookups) == len(tq):
+                # One-to-one replacement of the words of the phrase
+                ct.copy_origin(cast(CorrectToken, tq[i]))
+            else:
+                # Each replacement word refers to the entire phrase
+                ct.copy_origin(cast(List[CorrectToken], tq))
             if i == 0:
                 ct.set_error(
                     PhraseError(
                         MultiwordErrors.get_code(ix),
-                        "Orðasambandið '{0}' var leiðrétt í '{1}'".format(
-                            " ".join(t.txt for t in tq), " ".join(replacement)
-                        ),
+                        "Orðasambandið '{0}' var leiðrétt í '{1}'",
+                        args=(" ".join(t.txt for t in tq), " ".join(replacement)),
                         span=len(replacement),
                     )
                 )
@@ -1104,6 +1825,176 @@ WRONG_FORMERS_CI = {
 }
 
 
+# A factory for a fresh Error instance
+ErrorFactory = Callable[[], "Error"]
+
+# The outcome of a compound word analysis: a tuple of (word, meanings, error)
+# parts that replace the compound word token, where an error factory of None
+# means that the part should not be annotated. An empty tuple means that the
+# token should be left alone, and a word of None refers to the original token.
+CompoundOutcome = Tuple[
+    Tuple[Optional[str], Optional[List[BIN_Meaning]], Optional[ErrorFactory]], ...
+]
+
+# Maximum number of compound word analyses kept in the cache
+COMPOUND_CACHE_SIZE = 4096
+
+# The BIN_Db instance used for compound word analysis by the current
+# thread, cf. analyze_compound()
+_compound_db = local()
+
+
+@lru_cache(maxsize=COMPOUND_CACHE_SIZE)
+def cached_compound_analysis(
+    txt: str, stofn: str, at_sentence_start: bool, only_ci: bool
+) -> CompoundOutcome:
+
+    """ Analyze a compound word using the BIN_Db instance of the calling
+        thread. The analyses only depend on the BÍN data, which all BIN_Db
+        instances share, so the instance is not a part of the cache key.
+        Unlike reynir's LFU_Cache, lru_cache holds no lock while a result
+        is computed, so threads do not wait for each other's analyses. """
+
+    return _analyze_compound(_compound_db.db, txt, stofn, at_sentence_start, only_ci)
+
+
+def analyze_compound(
+    db: BIN_Db, txt: str, stofn: str, at_sentence_start: bool, only_ci: bool
+) -> CompoundOutcome:
+
+    """ Analyze a compound word, given its text and the stem of its first
+        meaning, and return the outcome. The results are cached since
+        compound words recur frequently; cached_compound_analysis.cache_info()
+        gives cache statistics. """
+
+    _compound_db.db = db
+    try:
+        return cached_compound_analysis(txt, stofn, at_sentence_start, only_ci)
+    finally:
+        # Don't keep the instance alive
+        _compound_db.db = None
+
+
+def _analyze_compound(
+    db: BIN_Db, txt: str, stofn: str, at_sentence_start: bool, only_ci: bool
+) -> CompoundOutcome:
+
+    """ Analyze a compound word, without caching """
+
+    cw = stofn.split("-")
+    # Special case for the prefix "ótal" which the compounder
+    # splits into ó-tal
+    if len(cw) >= 3 and cw[0] == "ó" and cw[1] == "tal":
+        cw = ["ótal"] + cw[2:]
+
+    # TODO STILLING - hér er ósamhengisháð leiðrétting!
+    if cw[0] in NOT_FORMERS:
+        # Prefix is invalid as such; should be split
+        # into two words
+        prefix = emulate_case(cw[0], txt)
+        w1, m1 = lookup_interned(db, prefix, at_sentence_start)
+        suffix = txt[len(cw[0]) :]
+        w2, m2 = lookup_interned(db, suffix, False)
+        return (
+            (
+                w1,
+                m1,
+                partial(
+                    CompoundError,
+                    "002",
+                    "Orðinu '{0}' var skipt upp",
+                    span=2,
+                    args=(txt,),
+                ),
+            ),
+            (w2, m2, None),
+        )
+
+    # TODO STILLING - hér er ósamhengisháð leiðrétting!
+    if cw[0] in Morphemes.FREE_DICT:
+        # Check which PoS, attachment depends on that
+        suffix = txt[len(cw[0]) :]
+        freepos = Morphemes.FREE_DICT.get(cw[0])
+        assert freepos is not None
+        w2, meanings2 = lookup_interned(db, suffix, False)
+        poses = set(m.ordfl for m in meanings2 if m.ordfl in freepos)
+        if not poses:
+            return ()
+        notposes = set(m.ordfl for m in meanings2 if m.ordfl not in freepos)
+        if not notposes:
+            # No other PoS available, we found an error
+            w1, meanings1 = lookup_interned(db, emulate_case(cw[0], txt), False)
+            return (
+                (
+                    w1,
+                    meanings1,
+                    partial(
+                        CompoundError,
+                        "002",
+                        "Orðinu '{0}' var skipt upp",
+                        span=2,
+                        args=(txt,),
+                    ),
+                ),
+                (w2, meanings2, None),
+            )
+        # TODO STILLING - hér er bara uppástunga.
+        # Other possibilities but want to mark as a possible error
+        # Often just weird forms in BÍN left
+        if only_ci:
+            return ()
+        transposes = list(set(POS[c] for c in poses))
+        if len(transposes) == 1:
+            tp = transposes[0]
+        else:
+            tp = ", ".join(transposes[:-1]) + " eða " + transposes[-1]
+        return (
+            (
+                None,
+                None,
+                partial(
+                    CompoundError,
+                    "005",
+                    "Ef '{0}' er {1} á að skipta orðinu upp",
+                    args=(txt, tp),
+                    span=2,
+                ),
+            ),
+        )
+
+    # TODO STILLING - hér er ósamhengisháð leiðrétting, en það er spurning hvort allt hér teljist endilega villa.
+    # TODO STILLING - viljum ekki endilega leiðrétta "byggingaregla", þó að venjan leyfi hitt frekar.
+    # TODO STILLING - Þarf að fara í gegnum WRONG_FORMERS, mætti skipta upp í
+    # TODO STILLING - ALWAYS_WRONG_FORMERS og MOSTLY_WRONG_FORMERS eða eitthvað þannig?
+    # TODO STILLING - fyrra alltaf leiðrétt, en seinna bara ábending?
+
+    # TODO STILLING - Athuga hvort hér ætti að hafa ólík villuskilaboð fyrir WRONG_FORMERS og WRONG_FORMERS_CI?
+    if cw[0] in WRONG_FORMERS_CI:
+        correct_former = WRONG_FORMERS_CI[cw[0]]
+    elif not only_ci and cw[0] in WRONG_FORMERS:
+        # Splice a correct front onto the word
+        # ('feyknaglaður' -> 'feiknaglaður')
+        correct_former = WRONG_FORMERS[cw[0]]
+    else:
+        # TODO Bæta inn leiðréttingu út frá seinni orðhlutum?
+        return ()
+    corrected = correct_former + txt[len(cw[0]) :]
+    corrected = emulate_case(corrected, txt)
+    w, m = lookup_interned(db, corrected, at_sentence_start)
+    return (
+        (
+            w,
+            m,
+            partial(
+                CompoundError,
+                "006",
+                "Samsetta orðinu '{0}' var breytt í '{1}'",
+                args=(txt, corrected),
+            ),
+        ),
+    )
+
+
 def fix_compound_words(
     token_stream: Iterable[CorrectToken],
     db: BIN_Db,
@@ -1134,136 +2025,73 @@ def fix_compound_words(
             continue
 
         # Compound word
-        cw = token.val[0].stofn.split("-")
-        # Special case for the prefix "ótal" which the compounder
-        # splits into ó-tal
-        if len(cw) >= 3 and cw[0] == "ó" and cw[1] == "tal":
-            cw = ["ótal"] + cw[2:]
+        outcome = analyze_compound(
+            db, token.txt, token.val[0].stofn, at_sentence_start, only_ci
+        )
+        if not outcome:
+            # Nothing wrong with this compound word
+            yield token
+        for w, m, error in outcome:
+            if w is None:
+                # Annotate the original token
+                t = token
+            else:
+                # The cached meaning list is shared, cf. lookup_interned()
+                t = token_ctor.Word(w, m or [], token=token)
+            if error is not None:
+                t.set_error(error())
+            yield t
+        at_sentence_start = False
 
-        # TODO STILLING - hér er ósamhengisháð leiðrétting!
-        if cw[0] in NOT_FORMERS:
-            # Prefix is invalid as such; should be split
-            # into two words
-            prefix = emulate_case(cw[0], token.txt)
-            w, m = db.lookup_word(prefix, at_sentence_start)
-            t1 = token_ctor.Word(w, m, token=token)
-            t1.set_error(
-                CompoundError(
-                    "002", "Orðinu '{0}' var skipt upp".format(token.txt), span=2
-                )
-            )
-            yield t1
-            at_sentence_start = False
-            suffix = token.txt[len(cw[0]) :]
-            w, m = db.lookup_word(suffix, at_sentence_start)
-            token = token_ctor.Word(w, m, token=token)
 
-        # TODO STILLING - hér er ósamhengisháð leiðrétting!
-        elif cw[0] in Morphemes.FREE_DICT:
-            # Check which PoS, attachment depends on that
-            at_sentence_start = False
-            suffix = token.txt[len(cw[0]) :]
-            freepos = Morphemes.FREE_DICT.get(cw[0])
-            assert freepos is not None
-            w2, meanings2 = db.lookup_word(suffix, at_sentence_start)
-            poses = set(m.ordfl for m in meanings2 if m.ordfl in freepos)
-            if not poses:
-                yield token
-                continue
-            notposes = set(m.ordfl for m in meanings2 if m.ordfl not in freepos)
-            if not notposes:
-                # No other PoS available, we found an error
-                w1, meanings1 = db.lookup_word(
-                    emulate_case(cw[0], token.txt), at_sentence_start
-                )
-                prefix = emulate_case(cw[0], token.txt)
-                t1 = token_ctor.Word(w1, meanings1, token=token)
-                t1.set_error(
-                    CompoundError(
-                        "002", "Orðinu '{0}' var skipt upp".format(token.txt), span=2
-                    )
-                )
-                yield t1
-                token = token_ctor.Word(w2, meanings2, token=token)
-            else:
-                # TODO STILLING - hér er bara uppástunga.
-                # Other possibilities but want to mark as a possible error
-                # Often just weird forms in BÍN left
-                if not only_ci:
-                    transposes = list(set(POS[c] for c in poses))
-                    if len(transposes) == 1:
-                        tp = transposes[0]
-                    else:
-                        tp = ", ".join(transposes[:-1]) + " eða " + transposes[-1]
-                    token.set_error(
-                        CompoundError(
-                            "005",
-                            "Ef '{0}' er {1} á að skipta orðinu upp".format(
-                                token.txt, tp
-                            ),
-                            span=2,
-                        )
-                    )
+def resolve_vocabulary(
+    token_stream: Iterable[CorrectToken], corrector: "Corrector"
+) -> Iterator[CorrectToken]:
 
-        # TODO STILLING - hér er ósamhengisháð leiðrétting, en það er spurning hvort allt hér teljist endilega villa.
-        # TODO STILLING - viljum ekki endilega leiðrétta "byggingaregla", þó að venjan leyfi hitt frekar.
-        # TODO STILLING - Þarf að fara í gegnum WRONG_FORMERS, mætti skipta upp í
-        # TODO STILLING - ALWAYS_WRONG_FORMERS og MOSTLY_WRONG_FORMERS eða eitthvað þannig?
-        # TODO STILLING - fyrra alltaf leiðrétt, en seinna bara ábending?
-
-        # TODO STILLING - Athuga hvort hér ætti að hafa ólík villuskilaboð fyrir WRONG_FORMERS og WRONG_FORMERS_CI?
-        elif cw[0] in WRONG_FORMERS_CI:
-            correct_former = WRONG_FORMERS_CI[cw[0]]
-            corrected = correct_former + token.txt[len(cw[0]) :]
-            corrected = emulate_case(corrected, token.txt)
-            w, m = db.lookup_word(corrected, at_sentence_start)
-            t1 = token_ctor.Word(w, m, token=token)
-            t1.set_error(
-                CompoundError(
-                    "006",
-                    "Samsetta orðinu '{0}' var breytt í '{1}'".format(
-                        token.txt, corrected
-                    ),
-                )
-            )
-            token = t1
-
-        elif not only_ci and cw[0] in WRONG_FORMERS:
-            # Splice a correct front onto the word
-            # ('feyknaglaður' -> 'feiknaglaður')
-            correct_former = WRONG_FORMERS[cw[0]]
-            corrected = correct_former + token.txt[len(cw[0]) :]
-            corrected = emulate_case(corrected, token.txt)
-            w, m = db.lookup_word(corrected, at_sentence_start)
-            t1 = token_ctor.Word(w, m, token=token)
-            t1.set_error(
-                CompoundError(
-                    "006",
-                    "Samsetta orðinu '{0}' var breytt í '{1}'".format(
-                        token.txt, corrected
-                    ),
-                )
-            )
-            token = t1
-        # TODO Bæta inn leiðréttingu út frá seinni orðhlutum?
-        yield token
-        at_sentence_start = False
+    """ Read the entire token stream and resolve the distinct word forms
+        in it in bulk, before yielding the tokens on to the next phase.
+        This way, the rarity and spelling correction candidates of
+        a word form are only looked up once per document, instead of
+        once per occurrence. """
+
+    tokens = list(token_stream)
+    words: Set[str] = set()
+    unknown: Set[str] = set()
+    for token in tokens:
+        if (
+            token.kind == TOK.WORD
+            and token.txt
+            and " " not in token.txt
+            and not token.error
+        ):
+            words.add(token.txt)
+            if not token.val:
+                unknown.add(token.txt)
+    corrector.resolve(words, unknown)
+    yield from tokens
 
 
 def lookup_unknown_words(
-    corrector: Corrector,
+    corrector: Optional["Corrector"],
     token_ctor: TokenCtor,
     token_stream: Iterable[CorrectToken],
     only_ci: bool,
     apply_suggestions: bool,
+    db: Optional[BIN_Db] = None,
 ) -> Iterator[CorrectToken]:
 
     """ Try to identify unknown words in the token stream, for instance
-        as spelling errors (character juxtaposition, deletion, insertion...) """
+        as spelling errors (character juxtaposition, deletion, insertion...).
+        If corrector is None, only_ci must be True; in that case, words are
+        not checked for rarity and the db parameter must be given. """
 
     at_sentence_start = False
     context: Tuple[str, ...] = tuple()
-    db = corrector.db
+    if corrector is not None:
+        db = corrector.db
+    else:
+        assert only_ci, "A Corrector is required for context-dependent checks"
+    assert db is not None
     # When entering parentheses, we push dict(closing=")", prefix=""),
     # where closing means the corresponding closing symbol (")", "]")
     # and prefix is the starting token within the parenthesis, if any,
@@ -1284,25 +2112,36 @@ def lookup_unknown_words(
         return False
 
     def replace_word(
-        code: int, token: CorrectToken, corrected: str, corrected_display: Optional[str]
+        code: int,
+        token: CorrectToken,
+        corrected: str,
+        corrected_display: Optional[str],
+        lookups: Dict[Tuple[str, bool], Tuple[str, List[Any]]],
     ) -> CorrectToken:
 
         """ Return a token for a corrected version of token_txt,
             marked with a SpellingError if corrected_display is
-            a string containing the corrected word to be displayed """
-
-        w, m = db.lookup_word(corrected, at_sentence_start)
+            a string containing the corrected word to be displayed.
+            BÍN lookups of corrected words are stored in the lookups
+            dict of the rule's settings class for subsequent use. """
+
+        key = (corrected, at_sentence_start)
+        wm = lookups.get(key)
+        if wm is None:
+            wm = lookups[key] = lookup_interned(db, corrected, at_sentence_start)
+        w, m = wm
         ct = token_ctor.Word(w, m, token=token if corrected_display else None)
+        ct.copy_origin(token)
         if corrected_display:
             if "." in corrected_display:
-                text = "Skammstöfunin '{0}' var leiðrétt í '{1}'".format(
-                    token.txt, corrected_display
-                )
+                text = "Skammstöfunin '{0}' var leiðrétt í '{1}'"
             else:
-                text = "Orðið '{0}' var leiðrétt í '{1}'".format(
-                    token.txt, corrected_display
+                text = "Orðið '{0}' var leiðrétt í '{1}'"
+            ct.set_error(
+                SpellingError(
+                    "{0:03}".format(code), text, args=(token.txt, corrected_display)
                 )
-            ct.set_error(SpellingError("{0:03}".format(code), text))
+            )
         else:
             # In a multi-word sequence, mark the replacement
             # tokens with a boolean value so that further
@@ -1320,19 +2159,23 @@ def lookup_unknown_words(
 
         ct = token_ctor.Word(w, m, token=token)
         if "." in corrected:
-            text = "Skammstöfunin '{0}' var leiðrétt í '{1}'".format(
-                token.txt, corrected
-            )
+            text = "Skammstöfunin '{0}' var leiðrétt í '{1}'"
         else:
-            text = "Orðið '{0}' var leiðrétt í '{1}'".format(token.txt, corrected)
-        ct.set_error(SpellingError("{0:03}".format(code), text))
+            text = "Orðið '{0}' var leiðrétt í '{1}'"
+        ct.set_error(
+            SpellingError("{0:03}".format(code), text, args=(token.txt, corrected))
+        )
         return ct
 
     def suggest_word(code: int, token: CorrectToken, corrected: str) -> CorrectToken:
         """ Mark the current token with an annotation but don't correct
             it, as we are not confident enough of the correction """
-        text = "Orðið '{0}' gæti átt að vera '{1}'".format(token.txt, corrected)
-        token.set_error(SpellingSuggestion("{0:03}".format(code), text, corrected))
+        text = "Orðið '{0}' gæti átt að vera '{1}'"
+        token.set_error(
+            SpellingSuggestion(
+                "{0:03}".format(code), text, corrected, args=(token.txt, corrected)
+            )
+        )
         return token
 
     def only_suggest(token: CorrectToken, m: List[BIN_Meaning]) -> bool:
@@ -1405,19 +2248,28 @@ def lookup_unknown_words(
         # Examples: 'kvenær' -> 'hvenær', 'starfssemi' -> 'starfsemi'
         # !!! TODO: Handle upper/lowercase
         # TODO STILLING - hér er ósamhengisháð leiðrétting!
-        if token.txt in UniqueErrors.DICT:
+        rules = RuleIndex.lookup(token.txt)
+        if rules & RuleIndex.UNIQUE_ERROR:
             # Note: corrected is a tuple
             corrected = UniqueErrors.DICT[token.txt]
             assert isinstance(corrected, tuple)
             corrected_display = " ".join(corrected)
             for ix, corrected_word in enumerate(corrected):
                 if ix == 0:
-                    rtok = replace_word(1, token, corrected_word, corrected_display)
+                    rtok = replace_word(
+                        1,
+                        token,
+                        corrected_word,
+                        corrected_display,
+                        UniqueErrors.LOOKUPS,
+                    )
                     at_sentence_start = False
                 else:
                     # In a multi-word sequence, we only mark the first
                     # token with a SpellingError
-                    rtok = replace_word(1, token, corrected_word, None)
+                    rtok = replace_word(
+                        1, token, corrected_word, None, UniqueErrors.LOOKUPS
+                    )
                 yield rtok
                 context = (prev_context + tuple(rtok.txt.split()))[-3:]
                 prev_context = context
@@ -1437,9 +2289,11 @@ def lookup_unknown_words(
         # !!! TODO: We are not handling those here.
         # !!! TODO: Handle upper/lowercase
         # TODO STILLING - hér er ósamhengisháð leiðrétting!
-        if not token.val and CIDErrorForms.contains(token.txt):
+        if rules & RuleIndex.CID_ERROR_FORM and not token.val:
             corr_txt = CIDErrorForms.get_correct_form(token.txt)
-            rtok = replace_word(2, token, corr_txt, corr_txt)
+            rtok = replace_word(
+                2, token, corr_txt, corr_txt, CIDErrorForms.LOOKUPS
+            )
             at_sentence_start = False
             # Update the context with the replaced token
             context = (prev_context + tuple(rtok.txt.split()))[-3:]
@@ -1453,16 +2307,19 @@ def lookup_unknown_words(
         # Check rare (or nonexistent) words and see if we have a potential correction
         # TODO STILLING - hér er samhengisháð leiðrétting af því að við notum þrenndir!
         # TODO STILLING - og líka því skoðum líka sjaldgæf orð.
-        elif not token.val or corrector.is_rare(token.txt):
+        elif not token.val or (
+            corrector is not None and corrector.is_rare(token.txt)
+        ):
             # Yes, this is a rare word that needs further attention
             if only_ci:
                 # Don't want to correct
                 token.set_error(
-                    UnknownWordError("001", "Óþekkt orð: '{0}'".format(token.txt))
+                    UnknownWordError("001", "Óþekkt orð: '{0}'", args=(token.txt,))
                 )
                 yield token
                 at_sentence_start = False
                 continue
+            assert corrector is not None
             if Settings.DEBUG:
                 print("Checking rare word '{0}'".format(token.txt))
             # We use context[-3:-1] since the current token is the last item
@@ -1529,8 +2386,9 @@ def lookup_unknown_words(
             token.set_error(
                 UnknownWordError(
                     "001",
-                    "Óþekkt orð: '{0}'".format(token.txt),
+                    "Óþekkt orð: '{0}'",
                     is_warning=token.txt[0].isupper() or bool(parenthesis_stack),
+                    args=(token.txt,),
                 )
             )
 
@@ -1553,6 +2411,7 @@ def fix_capitalization(
     """ Annotate tokens with errors if they are capitalized incorrectly """
 
     stems = CapitalizationErrors.SET_REV
+    stem_forms = capitalization_forms(db)
     # TODO STILLING - hér er blanda. Orð sem eiga alltaf að vera hástafa en birtast lágstafa eru ósh.,
     # TODO STILLING - orð sem eiga alltaf að vera lágstafa nema í byrjun setningar eru sh. leiðrétting.
 
@@ -1591,6 +2450,16 @@ def fix_capitalization(
             # All upper case or other strange capitalization:
             # don't bother
             return False
+        # Avoid the BÍN lookup if it can't find anything of interest.
+        # A title case word can only be wrong if the reversed-case word is
+        # a form of one of the stems in SET_REV. For a lower case word,
+        # the (cheap) check whether the reversed-case word is in BÍN at all
+        # suffices, since the BÍN trie can't be enumerated ahead of time.
+        if lower:
+            if rev_word not in db:
+                return False
+        elif stem_forms is not None and rev_word not in stem_forms:
+            return False
         meanings = db.meanings(rev_word) or []
         # If this is a word without BÍN meanings ('ástralía') but
         # an reversed-case version is in BÍN (without being a compound),
@@ -1650,7 +2519,8 @@ def fix_capitalization(
                     token.set_error(
                         CapitalizationError(
                             "002",
-                            "Orð á að byrja á hástaf: '{0}'".format(original_txt),
+                            "Orð á að byrja á hástaf: '{0}'",
+                            args=(original_txt,),
                         )
                     )
                 else:
@@ -1661,7 +2531,8 @@ def fix_capitalization(
                     token.set_error(
                         CapitalizationError(
                             "001",
-                            "Orð á að byrja á lágstaf: '{0}'".format(original_txt),
+                            "Orð á að byrja á lágstaf: '{0}'",
+                            args=(original_txt,),
                         )
                     )
         elif token.kind in {TOK.DATEREL, TOK.DATEABS}:
@@ -1683,6 +2554,7 @@ def fix_capitalization(
                         lower = token.txt.capitalize()
                     else:
                         lower = token.txt.lower()
+                    original = token
                     original_txt = token.txt
                     tval = cast(Tuple[int, int, int], token.val)
                     if token.kind == TOK.DATEREL:
@@ -1690,11 +2562,13 @@ def fix_capitalization(
                     else:
                         assert token.kind == TOK.DATEABS
                         token = token_ctor.Dateabs(lower, tval[0], tval[1], tval[2])
+                    token.copy_origin(original)
                     token.set_error(
                         CapitalizationError(
                             "003",
                             "Í dagsetningunni '{0}' á mánaðarnafnið "
-                            "að byrja á lágstaf".format(original_txt),
+                            "að byrja á lágstaf",
+                            args=(original_txt,),
                         )
                     )
 
@@ -1725,15 +2599,16 @@ def late_fix_capitalization(
         token: CorrectToken, replace: str, code: str, instruction_txt: str
     ) -> CorrectToken:
         """ Mark a number token with a capitalization error """
+        original = token
         original_txt = token.txt
         tval = cast(Tuple[int, int, int], token.val)
         token = token_ctor.Number(replace, tval[0], tval[1], tval[2])
+        token.copy_origin(original)
         token.set_error(
             CapitalizationError(
                 code,
-                "Töluna eða fjárhæðina '{0}' á að rita {1}".format(
-                    original_txt, instruction_txt
-                ),
+                "Töluna eða fjárhæðina '{0}' á að rita {1}",
+                args=(original_txt, instruction_txt),
             )
         )
         return token
@@ -1784,12 +2659,15 @@ def late_fix_capitalization(
                 lower = token.txt.lower()
                 # token.val tuple: (n, iso, cases, genders)
                 tval2 = cast(Tuple[float, str, Any, Any], token.val)
+                original = token
                 token = token_ctor.Amount(lower, tval2[1], tval2[0], tval2[2], tval2[3])
+                token.copy_origin(original)
                 token.set_error(
                     CapitalizationError(
                         "005",
                         "Fjárhæðina '{0}' á að rita "
-                        "með lágstöfum".format(original_txt),
+                        "með lágstöfum",
+                        args=(original_txt,),
                     )
                 )
         elif token.kind == TOK.MEASUREMENT:
@@ -1801,31 +2679,81 @@ def late_fix_capitalization(
             at_sentence_start = False
 
 
-def check_taboo_words(token_stream: Iterable[CorrectToken]) -> Iterator[CorrectToken]:
-    """ Annotate taboo words with warnings """
-
-    for token in token_stream:
+def taboo_forms(db: BIN_Db) -> Optional[Dict[str, FrozenSet[str]]]:
+    """ Return a dictionary of the inflected forms of taboo words,
+        generating it from BÍN on first use, or None if the forms
+        cannot be listed """
+    forms = TabooWords.FORMS
+    if forms is None:
+        if compressed_bin(db) is None:
+            return None
+        with _INDEX_LOCK:
+            forms = TabooWords.FORMS
+            if forms is None:
+                d: Dict[str, Set[str]] = defaultdict(set)
+                for lemma in TabooWords.DICT:
+                    for form in inflected_forms(db, lemma) or ():
+                        d[form.lower()].add(lemma)
+                forms = TabooWords.FORMS = {
+                    form: frozenset(lemmas) for form, lemmas in d.items()
+                }
+    return forms
+
+
+def check_taboo_batch(tokens: TokenBatch, db: BIN_Db) -> TokenBatch:
+    """ Annotate taboo words in a sentence with warnings """
+
+    forms = taboo_forms(db)
+    if forms is not None:
+        # Only the inflected forms of taboo words are candidates: find
+        # them for the entire sentence in a single set intersection
+        hits = forms.keys() & {
+            token.txt.lower()
+            for token in tokens
+            if token.kind == TOK.WORD and token.val
+        }
+        if not hits:
+            return tokens
+
+    for token in tokens:
         # TODO STILLING - hér er ósamhengisháð leiðrétting EN er bara uppástunga.
         # Check taboo words
-        if token.kind == TOK.WORD and token.val:
-            # !!! TODO: This could be made more efficient if all
-            # !!! TODO: taboo word forms could be generated ahead of time
-            # !!! TODO: and checked via a set lookup
-            for m in token.val:
-                stofn = m.stofn.replace("-", "")
-                if stofn in TabooWords.DICT:
-                    # Taboo word
-                    suggested_word = TabooWords.DICT[stofn].split("_")[0]
-                    token.set_error(
-                        TabooWarning(
-                            "001",
-                            "Óheppilegt eða óviðurkvæmilegt orð, "
-                            "skárra væri t.d. '{0}'".format(suggested_word),
-                        )
+        if token.kind != TOK.WORD or not token.val:
+            continue
+        lemmas: Iterable[str]
+        if forms is None:
+            # The forms could not be listed: check all meanings
+            lemmas = TabooWords.DICT
+        else:
+            lemmas = forms.get(token.txt.lower(), ())
+            if not lemmas:
+                continue
+        # Confirm the candidate by looking for a taboo word among the
+        # meanings. Verbs have no listed forms in BÍN, so verbs that share
+        # their infinitive with a taboo word are not flagged.
+        for m in token.val:
+            stofn = m.stofn.replace("-", "")
+            if m.ordfl != "so" and stofn in lemmas:
+                # Taboo word
+                suggested_word = TabooWords.DICT[stofn].split("_")[0]
+                token.set_error(
+                    TabooWarning(
+                        "001",
+                        "Óheppilegt eða óviðurkvæmilegt orð, "
+                        "skárra væri t.d. '{0}'",
+                        args=(suggested_word,),
                     )
-                    break
+                )
+                break
 
-        yield token
+    return tokens
+
+
+def check_taboo_words(
+    token_stream: Iterable[CorrectToken], db: BIN_Db
+) -> Iterator[CorrectToken]:
+    """ Annotate taboo words with warnings """
+    return run_batch_stages(token_stream, [partial(check_taboo_batch, db=db)])
 
 
 class Correct_TOK(TOK):
@@ -1840,8 +2768,10 @@ class Correct_TOK(TOK):
         if token is not None:
             # This token is being constructed in reference to a previously
             # generated token, or a list of tokens, which might have had
-            # an associated error: make sure that it is preserved
+            # an associated error: make sure that it is preserved,
+            # along with the character span of the original text
             ct.copy_error(token)
+            ct.copy_origin(token)
         return ct
 
     @staticmethod
@@ -1850,8 +2780,10 @@ class Correct_TOK(TOK):
         if token is not None:
             # This token is being constructed in reference to a previously
             # generated token, or a list of tokens, which might have had
-            # an associated error: make sure that it is preserved
+            # an associated error: make sure that it is preserved,
+            # along with the character span of the original text
             ct.copy_error(token, coalesce=True)
+            ct.copy_origin(token)
         return ct
 
     @staticmethod
@@ -1860,8 +2792,10 @@ class Correct_TOK(TOK):
         if token is not None:
             # This token is being constructed in reference to a previously
             # generated token, or a list of tokens, which might have had
-            # an associated error: make sure that it is preserved
+            # an associated error: make sure that it is preserved,
+            # along with the character span of the original text
             ct.copy_error(token, coalesce=True)
+            ct.copy_origin(token)
         return ct
 
     @staticmethod
@@ -1870,8 +2804,10 @@ class Correct_TOK(TOK):
         if token is not None:
             # This token is being constructed in reference to a previously
             # generated token, or a list of tokens, which might have had
-            # an associated error: make sure that it is preserved
+            # an associated error: make sure that it is preserved,
+            # along with the character span of the original text
             ct.copy_error(token)
+            ct.copy_origin(token)
         return ct
 
     @staticmethod
@@ -1880,8 +2816,10 @@ class Correct_TOK(TOK):
         if token is not None:
             # This token is being constructed in reference to a previously
             # generated token, or a list of tokens, which might have had
-            # an associated error: make sure that it is preserved
+            # an associated error: make sure that it is preserved,
+            # along with the character span of the original text
             ct.copy_error(token)
+            ct.copy_origin(token)
         return ct
 
     @staticmethod
@@ -1890,8 +2828,10 @@ class Correct_TOK(TOK):
         if token is not None:
             # This token is being constructed in reference to a previously
             # generated token, or a list of tokens, which might have had
-            # an associated error: make sure that it is preserved
+            # an associated error: make sure that it is preserved,
+            # along with the character span of the original text
             ct.copy_error(token)
+            ct.copy_origin(token)
         return ct
 
     @staticmethod
@@ -1900,11 +2840,90 @@ class Correct_TOK(TOK):
         if token is not None:
             # This token is being constructed in reference to a previously
             # generated token, or a list of tokens, which might have had
-            # an associated error: make sure that it is preserved
+            # an associated error: make sure that it is preserved,
+            # along with the character span of the original text
             ct.copy_error(token)
+            ct.copy_origin(token)
         return ct
 
 
+def track_origins(
+    token_stream: Iterable[Tok], origins: Deque[CharSpan]
+) -> Iterator[CorrectToken]:
+
+    """ Wrap the raw tokens from the tokenizer in CorrectToken instances
+        carrying the character span of each token within the original text.
+        The tokenizer provides the original text of each token, including
+        preceding whitespace, so the spans are found by keeping a running
+        offset. The spans are also appended to the origins deque, for use
+        by fill_origins(). """
+
+    pos = 0
+    for token in token_stream:
+        ct = CorrectToken.from_token(token)
+        original: Optional[str] = getattr(token, "original", None)
+        if original:
+            spans = token.origin_spans
+            end = pos + len(original)
+            if spans:
+                # Skip the whitespace preceding the token
+                ct.set_origin(pos + spans[0], end)
+                origins.append(cast(CharSpan, ct.origin))
+            pos = end
+        yield ct
+
+
+def fill_origins(
+    token_stream: Iterable[CorrectToken], origins: Deque[CharSpan]
+) -> Iterator[CorrectToken]:
+
+    """ Assign character spans to tokens that were constructed without
+        reference to the original tokens, such as coalesced numbers,
+        amounts and person names. Such a token covers the raw tokens
+        lying between the preceding and the following tokens whose spans
+        are known. Tokens that are not CorrectToken instances are wrapped. """
+
+    # Tokens waiting for the next token with a known span
+    pending: List[CorrectToken] = []
+    prev_end = 0
+
+    def fill(next_start: Optional[int]) -> None:
+        """ Distribute the raw token spans between prev_end and next_start
+            among the pending tokens that have text but no span """
+        while origins and origins[0][1] <= prev_end:
+            origins.popleft()
+        raw: List[CharSpan] = []
+        while origins and (next_start is None or origins[0][1] <= next_start):
+            raw.append(origins.popleft())
+        missing = [t for t in pending if t.txt and t.origin is None]
+        for i, t in enumerate(missing):
+            if not raw:
+                break
+            if i == len(missing) - 1:
+                # The last token gets the remaining raw tokens
+                n = len(raw)
+            else:
+                # Assume one raw token per word of the token text
+                n = min(len(t.txt.split()), len(raw))
+            t.set_origin(raw[0][0], raw[n - 1][1])
+            raw = raw[n:]
+
+    for token in token_stream:
+        ct = CorrectToken.from_token(token)
+        if ct.origin is None:
+            pending.append(ct)
+            continue
+        if pending:
+            fill(ct.char_start)
+            yield from pending
+            pending = []
+        prev_end = cast(int, ct.char_end)
+        yield ct
+    if pending:
+        fill(None)
+        yield from pending
+
+
 class CorrectionPipeline(DefaultPipeline):
 
     """ Override the default tokenization pipeline defined in bintokenizer.py
@@ -1915,45 +2934,126 @@ class CorrectionPipeline(DefaultPipeline):
     _token_ctor = cast(Type[Bin_TOK], Correct_TOK)
 
     def __init__(self, text_or_gen: StringIterable, **options) -> None:
-        super().__init__(text_or_gen, **options)
-        self._corrector: Optional[Corrector] = None
         # If only_ci is True, we only correct context-independent errors
         self._only_ci = options.pop("only_ci", False)
         # If apply_suggestions is True, we are aggressive in modifying
         # tokens with suggested corrections, i.e. not just suggesting them
         self._apply_suggestions = options.pop("apply_suggestions", False)
+        # If two_pass is True, the distinct word forms of the entire text
+        # are resolved in bulk before unknown words are looked up
+        self._two_pass = options.pop("two_pass", False)
+        # An existing Corrector instance, with its caches, can be passed
+        # in to be reused, cf. CheckerSession. Otherwise, one is created
+        # on first use.
+        corrector: Optional["Corrector"] = options.pop("corrector", None)
+        # The error codes to check for, cf. CodeSet. Stages that cannot
+        # emit any enabled code are skipped.
+        self._codes = CodeSet.of(options.pop("codes", None))
+        # Custom word-level checks, cf. TokenRuleEngine
+        self._rules: Optional[TokenRuleEngine] = options.pop("rules", None)
+        # Note that the correction options must be removed before
+        # the remaining options are passed on to the tokenizer
+        super().__init__(text_or_gen, **options)
+        self._corrector = corrector
+        # Character spans of raw tokens, cf. track_origins()
+        self._origins: Deque[CharSpan] = deque()
+
+    def tokenize_without_annotation(self) -> TokenIterator:
+        """ Wrap the raw tokens, tracking their character spans
+            within the original text """
+        return cast(
+            TokenIterator,
+            track_origins(super().tokenize_without_annotation(), self._origins),
+        )
+
+    def create_corrector(self) -> Optional["Corrector"]:
+        """ Create a Corrector instance for spelling correction.
+            This imports the spelling module and loads the icegrams
+            n-gram model, if not already loaded. """
+        assert self._db is not None
+        from .spelling import Corrector
+
+        return Corrector(self._db)
+
+    def annotate(self, stream: TokenIterator) -> TokenIterator:
+        """ Look up meanings from BÍN, sharing identical meaning lists
+            and interning strings across tokens, cf. lookup_interned() """
+        assert self._db is not None
+        return annotate(
+            cast(BIN_Db, InterningDb(self._db)),
+            self._token_ctor,
+            stream,
+            auto_uppercase=self._auto_uppercase,
+            no_sentence_start=self._no_sentence_start,
+        )
 
     def correct_tokens(self, stream: TokenIterator) -> TokenIterator:
         """ Add a correction pass just before BÍN annotation """
         assert self._db is not None
+        if not self._codes.any_enabled(PARSE_ERRORS_CODES):
+            return stream
         return cast(TokenIterator, parse_errors(stream, self._db, self._only_ci))
 
     def check_spelling(self, stream: TokenIterator) -> TokenIterator:
         """ Attempt to resolve unknown words """
         # Create a Corrector on the first invocation
         assert self._db is not None
-        if self._corrector is None:
-            self._corrector = Corrector(self._db)
+        codes = self._codes
+        check_unknown = codes.any_enabled(UNKNOWN_WORD_CODES)
+        if self._corrector is None and check_unknown:
+            self._corrector = self.create_corrector()
         only_ci = self._only_ci
         # Shenanigans to satisfy mypy
         token_ctor = cast(TokenCtor, self._token_ctor)
         ct_stream = cast(Iterator[CorrectToken], stream)
         # Fix compound words
-        ct_stream = fix_compound_words(ct_stream, self._db, token_ctor, only_ci)
+        if codes.any_enabled(COMPOUND_CODES):
+            ct_stream = fix_compound_words(ct_stream, self._db, token_ctor, only_ci)
         # Fix multiword error phrases
-        if not only_ci:
+        if not only_ci and codes.any_enabled(phrase_codes()):
             ct_stream = handle_multiword_errors(ct_stream, self._db, token_ctor)
         # Fix capitalization
-        ct_stream = fix_capitalization(ct_stream, self._db, token_ctor, only_ci)
-        # Fix single-word errors
-        ct_stream = lookup_unknown_words(
-            self._corrector, token_ctor, ct_stream, only_ci, self._apply_suggestions
-        )
-        # Check taboo words
-        if not only_ci:
-            ct_stream = check_taboo_words(ct_stream)
+        if codes.any_enabled(CAPITALIZATION_CODES):
+            ct_stream = fix_capitalization(ct_stream, self._db, token_ctor, only_ci)
+        if check_unknown:
+            # Resolve the vocabulary of the entire text, if requested
+            if self._two_pass and self._corrector is not None:
+                ct_stream = resolve_vocabulary(ct_stream, self._corrector)
+            # Fix single-word errors
+            ct_stream = lookup_unknown_words(
+                self._corrector,
+                token_ctor,
+                ct_stream,
+                only_ci,
+                self._apply_suggestions,
+                db=self._db,
+            )
+        # Run the sentence-level stages, if any
+        batch_stages = self.batch_stages()
+        if batch_stages:
+            ct_stream = run_batch_stages(ct_stream, batch_stages)
         return cast(TokenIterator, ct_stream)
 
+    def batch_stages(self) -> List[BatchStage]:
+        """ Return the sentence-level stages that are run at the end of
+            the spelling check phase, cf. run_batch_stages(). Override
+            this in derived classes to add stages; token generator stages
+            can be added using batch_adapter(). Only the taboo word check
+            and the custom rules are batch stages. parse_errors() and
+            lookup_unknown_words() remain token generators, as they keep
+            lookahead and context state across tokens, and their own cost
+            is small next to that of the spelling corrector they call. """
+        assert self._db is not None
+        stages: List[BatchStage] = []
+        if not self._only_ci and self._codes.any_enabled(TABOO_CODES):
+            # Check taboo words
+            stages.append(partial(check_taboo_batch, db=self._db))
+        if self._rules:
+            # Run the custom word-level rules
+            codes = None if self._codes.all else self._codes
+            stages.append(self._rules.stage(codes))
+        return stages
+
     def final_correct(self, stream: TokenIterator) -> TokenIterator:
         """ Final correction pass """
         assert self._db is not None
@@ -1961,10 +3061,36 @@ class CorrectionPipeline(DefaultPipeline):
         # as numbers ('24 Milljónir') and amounts ('3 Þúsund Dollarar')
         token_ctor = cast(TokenCtor, self._token_ctor)
         ct_stream = cast(Iterator[CorrectToken], stream)
-        return cast(
-            TokenIterator,
-            late_fix_capitalization(ct_stream, self._db, token_ctor, self._only_ci),
-        )
+        if self._codes.any_enabled(CAPITALIZATION_CODES):
+            ct_stream = late_fix_capitalization(
+                ct_stream, self._db, token_ctor, self._only_ci
+            )
+        if not self._codes.all:
+            # Remove errors with disabled codes from tokens that
+            # were processed by stages that emit a mix of codes
+            ct_stream = filter_errors(ct_stream, self._codes)
+        # Assign character spans to coalesced tokens
+        return cast(TokenIterator, fill_origins(ct_stream, self._origins))
+
+
+class CIOnlyPipeline(CorrectionPipeline):
+
+    """ A lightweight correction pipeline that only corrects
+        context-independent errors. It uses BÍN and the configuration
+        tables only, and never imports or loads the icegrams n-gram model.
+        Note that since word frequencies are not available, rare words
+        that exist in BÍN are not flagged as possibly unknown, as they
+        are by CorrectionPipeline with only_ci=True. """
+
+    def __init__(self, text_or_gen: StringIterable, **options) -> None:
+        options["only_ci"] = True
+        # A Corrector is never used, even if one is passed in
+        options.pop("corrector", None)
+        super().__init__(text_or_gen, **options)
+
+    def create_corrector(self) -> Optional["Corrector"]:
+        """ No Corrector, and thus no n-gram model, is needed """
+        return None
 
 
 def tokenize(text_or_gen: StringIterable, **options) -> Iterator[CorrectToken]:
@@ -1972,3 +3098,10 @@ def tokenize(text_or_gen: StringIterable, **options) -> Iterator[CorrectToken]:
         overriding a part of the default tokenization pipeline """
     pipeline = CorrectionPipeline(text_or_gen, **options)
     return cast(Iterator[CorrectToken], pipeline.tokenize())
+
+
+def tokenize_ci(text_or_gen: StringIterable, **options) -> Iterator[CorrectToken]:
+    """ Tokenize text using the lightweight, context-independent
+        correction pipeline, which does not load the n-gram model """
+    pipeline = CIOnlyPipeline(text_or_gen, **options)
+    return cast(Iterator[CorrectToken], pipeline.tokenize())
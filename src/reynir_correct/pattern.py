@@ -51,6 +51,7 @@ from reynir.simpletree import SimpleTree
 from reynir.verbframe import VerbErrors
 
 from .annotation import Annotation
+from .errtokenizer import CodeSet
 
 
 # The types involved in pattern processing
@@ -58,7 +59,7 @@ CheckFunction = Callable[[SimpleTree], bool]
 ContextType = Dict[str, Union[str, CheckFunction]]
 AnnotationFunction = Callable[["PatternMatcher", SimpleTree], None]
 PatternTuple = Tuple[
-    Union[str, FrozenSet[str]], str, AnnotationFunction, Optional[ContextType]
+    Union[str, FrozenSet[str]], str, AnnotationFunction, Optional[ContextType], str
 ]
 
 
@@ -130,7 +131,7 @@ class PatternMatcher:
     # The patterns to be matched are created when the
     # first class instance is initialized.
 
-    # Each entry in the patterns list is a tuple of four values:
+    # Each entry in the patterns list is a tuple of five values:
 
     # * Trigger lemma, which must be present in the sentence for the pattern
     #   to be applied. This is an optimization only, to save unnecessary matching.
@@ -139,6 +140,8 @@ class PatternMatcher:
     # * Match pattern expression, to be passed to match_pattern()
     # * Annotation function, called for each match
     # * Context dictionary to be passed to match_pattern()
+    # * Error code of the annotations created by the annotation function.
+    #   Patterns whose codes are not enabled are skipped, cf. CodeSet.
 
     PATTERNS: List[PatternTuple] = []
 
@@ -150,20 +153,34 @@ class PatternMatcher:
     ctx_verb_02: Optional[ContextType] = None
     ctx_place_names: Optional[ContextType] = None
 
-    def __init__(self, ann: List[Annotation], sent: _Sentence) -> None:
+    # All error codes that the patterns can generate
+    CODES = ("P001", "P002", "P_WRONG_PLACE_PP")
+
+    def __init__(
+        self, ann: List[Annotation], sent: _Sentence, codes: Optional[CodeSet] = None
+    ) -> None:
         # Annotation list
         self._ann = ann
+        # The enabled error codes
+        self._codes = codes or CodeSet()
         # The original sentence object
         self._sent = sent
         # Token list
         self._tokens = sent.tokens
         # Terminal node list
         self._terminal_nodes = sent.terminal_nodes
+        # Create the class-wide pattern list, if not already done
+        self.patterns()
+
+    @classmethod
+    def patterns(cls) -> List[PatternTuple]:
+        """ Return the list of patterns, creating it if necessary """
         # Avoid race conditions in multi-threaded scenarios
-        with self._LOCK:
-            if not self.PATTERNS:
-                # First instance: create the class-wide pattern list
-                self.create_patterns()
+        with cls._LOCK:
+            if not cls.PATTERNS:
+                # First call: create the class-wide pattern list
+                cls.create_patterns()
+        return cls.PATTERNS
 
     def wrong_preposition_af(self, match: SimpleTree) -> None:
         """ Handle a match of a suspect preposition pattern """
@@ -410,6 +427,7 @@ class PatternMatcher:
                     'VP > { VP >> { %verb } PP >> { P > { "af" } } }',
                     cls.wrong_preposition_af,
                     cls.ctx_af,
+                    "P001",
                 )
             )
             # Catch sentences such as 'Vissulega er hægt að brosa af þessu',
@@ -420,6 +438,7 @@ class PatternMatcher:
                     '. > { (NP-PRD | IP-INF) > { VP > { %verb } } PP >> { P > { "af" } } }',
                     cls.wrong_preposition_af,
                     cls.ctx_af,
+                    "P001",
                 )
             )
 
@@ -431,6 +450,7 @@ class PatternMatcher:
                     'ADVP > "af" }',
                     cls.wrong_preposition_vitni_af,
                     None,
+                    "P001",
                 )
             )
             # Catch "Hún varð vitni af því þegar kúturinn sprakk"
@@ -441,6 +461,7 @@ class PatternMatcher:
                     'NP-PRD > { "vitni" PP > { P > { "af" } } } ] } ',
                     cls.wrong_preposition_vitni_af,
                     None,
+                    "P001",
                 )
             )
 
@@ -459,6 +480,7 @@ class PatternMatcher:
                     'VP > { VP >> { %verb } PP >> { P > { "að" } } }',
                     cls.wrong_preposition_að,
                     cls.ctx_að,
+                    "P001",
                 )
             )
             # Catch sentences such as 'Vissulega er hægt að heillast að þessu'
@@ -468,6 +490,7 @@ class PatternMatcher:
                     '. > { (NP-PRD | IP-INF) > { VP > { %verb } } PP >> { P > { "að" } } }',
                     cls.wrong_preposition_að,
                     cls.ctx_að,
+                    "P001",
                 )
             )
 
@@ -478,6 +501,7 @@ class PatternMatcher:
                     "VP > { VP > [ .* ('verða' | 'vera') ] NP-PRD > [ .* 'heilla' .* ADVP > { \"að\" } ] }",
                     cls.wrong_preposition_heillaður_að,
                     None,
+                    "P001",
                 )
             )
 
@@ -518,6 +542,7 @@ class PatternMatcher:
                     match, "bíða", cast(ContextType, cls.ctx_verb_01),
                 ),
                 cls.ctx_verb_01,
+                "P002",
             )
         )
 
@@ -531,6 +556,7 @@ class PatternMatcher:
                     match, "hengja", cast(ContextType, cls.ctx_verb_02),
                 ),
                 cls.ctx_verb_02,
+                "P002",
             )
         )
 
@@ -549,6 +575,7 @@ class PatternMatcher:
                 "PP > { P > ('á' | 'í') NP > %maybe_place }",
                 lambda self, match: self.check_pp_with_place(match),
                 cls.ctx_place_names,
+                "P_WRONG_PLACE_PP",
             )
         )
 
@@ -572,10 +599,12 @@ class PatternMatcher:
                 return trigger in lemmas
             return bool(lemmas & trigger)
 
-        for trigger, pattern, func, context in self.PATTERNS:
+        codes = self._codes
+        for trigger, pattern, func, context, code in self.PATTERNS:
             # We only do the expensive pattern matching if the trigger lemma
-            # for a pattern rule (if given) is actually found in the sentence
-            if lemma_match(trigger):
+            # for a pattern rule (if given) is actually found in the sentence,
+            # and if the error code of the pattern is enabled
+            if lemma_match(trigger) and codes.enabled(code):
                 for match in tree.all_matches(pattern, context):
                     # Call the annotation function for this match
                     func(self, match)
@@ -41,7 +41,7 @@
 
 """
 
-from typing import Dict, Set, List, Tuple
+from typing import Any, Dict, Set, FrozenSet, List, Tuple, Optional
 import os
 import locale
 import threading
@@ -81,12 +81,20 @@ class WrongCompounds:
             raise ConfigError("Multiple definition of '{0}' in wrong_compounds section".format(word))
         assert isinstance(parts, tuple)
         WrongCompounds.DICT[word] = parts
+        Settings.modified()
 
 
 class SplitCompounds:
 
     # Dict of the form { first_part : set(second_part_stem) }
     DICT: Dict[str, Set[str]] = defaultdict(set)
+    # Set of (first_part, second_part_form) tuples, where the second part
+    # is an inflected form of one of the stems, in lower case, generated
+    # from BÍN on first use by the correcting tokenizer
+    PAIRS: Optional[FrozenSet[Tuple[str, str]]] = None
+    # First parts having second part stems whose forms could not be
+    # generated from BÍN, so that the second part must be looked up
+    LOOKUP_FIRST: FrozenSet[str] = frozenset()
 
     @staticmethod
     def add(first_part: str, second_part_stem: str) -> None:
@@ -99,18 +107,24 @@ class SplitCompounds:
                 .format(first_part + " " + second_part_stem)
             )
         SplitCompounds.DICT[first_part].add(second_part_stem)
+        SplitCompounds.PAIRS = None
+        Settings.modified()
 
 
 class UniqueErrors:
 
     # Dictionary structure: dict { wrong_word : (tuple of right words) }
     DICT: Dict[str, Tuple[str, ...]] = {}
+    # BÍN lookups of replacement words, populated on first use by the
+    # correcting tokenizer: dict { (right_word, at_sentence_start) : (word, meanings) }
+    LOOKUPS: Dict[Tuple[str, bool], Tuple[str, List[Any]]] = {}
 
     @staticmethod
     def add(word: str, corr: Tuple[str, ...]) -> None:
         if word in UniqueErrors.DICT:
             raise ConfigError("Multiple definition of '{0}' in unique_errors section".format(word))
         UniqueErrors.DICT[word] = corr
+        Settings.modified()
 
 
 class MultiwordErrors:
@@ -122,6 +136,9 @@ class MultiwordErrors:
     DICT: Dict[str, List[Tuple[Tuple[str, ...], int]]] = defaultdict(list)
     # Error dictionary, { phrase : (error_code, right_phrase, right_parts_of_speech) }
     ERROR_DICT: Dict[Tuple[str, ...], str] = dict()
+    # BÍN lookups of replacement phrases, populated on first use by the
+    # correcting tokenizer: dict { phrase_index : [ (word, meanings) ] }
+    LOOKUPS: Dict[int, List[Tuple[str, List[Any]]]] = dict()
 
     @staticmethod
     def add(words: Tuple[str, ...], error: str) -> None:
@@ -172,12 +189,17 @@ class TabooWords:
 
     # Dictionary structure: dict { taboo_word : suggested_replacement }
     DICT: Dict[str, str] = {}
+    # Inflected forms of the taboo words, in lower case, generated from BÍN
+    # on first use by the correcting tokenizer:
+    # dict { word_form : frozenset of taboo words }
+    FORMS: Optional[Dict[str, FrozenSet[str]]] = None
 
     @staticmethod
     def add(word: str, replacement: str) -> None:
         if word in TabooWords.DICT:
             raise ConfigError("Multiple definition of '{0}' in taboo_words section".format(word))
         TabooWords.DICT[word] = replacement
+        TabooWords.FORMS = None
 
 
 class Suggestions:
@@ -198,6 +220,9 @@ class CapitalizationErrors:
     SET: Set[str] = set()
     # Reverse capitalization (íslendingur -> Íslendingur, Danskur -> danskur)
     SET_REV: Set[str] = set()
+    # Inflected forms of the stems in SET_REV, generated from BÍN
+    # on first use by the correcting tokenizer
+    FORMS: Optional[FrozenSet[str]] = None
 
     @staticmethod
     def add(word: str) -> None:
@@ -213,6 +238,7 @@ class CapitalizationErrors:
         else:
             assert word.istitle()
             CapitalizationErrors.SET_REV.add(word.lower())
+        CapitalizationErrors.FORMS = None
 
 
 class OwForms:
@@ -275,6 +301,10 @@ class CIDErrorForms:
 
     # dict { wrong_word_form : (lemma, correct_word_form, id, cat, tag) }
     DICT: Dict[str, Tuple[str, str, int, str, str]] = dict()
+    # BÍN lookups of correct word forms, populated on first use by the
+    # correcting tokenizer:
+    # dict { (correct_form, at_sentence_start) : (word, meanings) }
+    LOOKUPS: Dict[Tuple[str, bool], Tuple[str, List[Any]]] = dict()
 
     @staticmethod
     def contains(word):
@@ -288,6 +318,7 @@ class CIDErrorForms:
     @staticmethod
     def add(wrong_form, meaning):
         CIDErrorForms.DICT[wrong_form] = meaning
+        Settings.modified()
 
     @staticmethod
     def get_lemma(wrong_form):
@@ -397,6 +428,7 @@ class Morphemes:
         Morphemes.BOUND_DICT[morph] = boundlist
         # The freelist may be empty
         Morphemes.FREE_DICT[morph] = freelist
+        Settings.modified()
 
 
 class Settings:
@@ -406,6 +438,14 @@ class Settings:
     _lock = threading.Lock()
     loaded = False
     DEBUG = os.environ.get("DEBUG", "").strip() in TRUE
+    # Incremented whenever a word-level correction table is modified,
+    # so that indexes compiled from the tables can be rebuilt
+    generation = 0
+
+    @staticmethod
+    def modified() -> None:
+        """ Note that a word-level correction table has been modified """
+        Settings.generation += 1
 
     # Configuration settings from the GreynirCorrect.conf file
 
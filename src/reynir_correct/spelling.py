@@ -35,7 +35,7 @@
 
 """
 
-from typing import List, Tuple, Set, Optional, Iterable, Callable
+from typing import Dict, List, Tuple, Set, Optional, Iterable, Callable
 from typing import TYPE_CHECKING
 
 import os
@@ -388,6 +388,10 @@ class Corrector:
     # Singleton Ngrams dictionary
     _NGRAMS: Optional[Ngrams] = None
 
+    # When the vocabulary resolved by resolve() reaches this number
+    # of word forms, it is discarded before more words are added
+    MAX_VOCABULARY = 100000
+
     def __init__(self, db: BIN_Db, dictionary: Optional[Ngrams] = None) -> None:
         # Word database
         self._db = db
@@ -403,6 +407,10 @@ class Corrector:
         self.logprob = self.ngrams.logprob
         # Function for (adjusted) frequency of word
         self.freq = self.ngrams.adj_freq
+        # Vocabulary of resolved word forms, cf. resolve():
+        # { word : is_rare } and { lower case word : [ (candidate, edit factor) ] }
+        self._rare: Dict[str, bool] = dict()
+        self._candidates: Dict[str, List[Tuple[str, float]]] = dict()
 
     @property
     def db(self) -> BIN_Db:
@@ -462,20 +470,15 @@ class Corrector:
             # print(result)
             yield "".join(result)
 
-    def _correct(
-        self,
-        original_word: str,
-        word: str,
-        context: Tuple[str, ...],
-        at_sentence_start: bool,
-    ) -> str:
-        """ Find the best spelling correction for this word.
-            Credits for parts of this elegant code are due to Peter Norvig,
-            cf. http://nbviewer.jupyter.org/url/norvig.com/ipython/
-            How%20to%20Do%20Things%20with%20Words.ipynb """
+    def _candidate_words(self, word: str) -> List[Tuple[str, float]]:
+        """ Return a list of (candidate, edit factor) tuples for the given
+            lower case word, in order of generally decreasing likelihood.
+            The candidates do not depend on the context of the word, so
+            they are looked up in the resolved vocabulary, if present. """
 
-        # Note: word is assumed to be in lowercase, while
-        # original_word has the original case from the source text
+        candidates = self._candidates.get(word)
+        if candidates is not None:
+            return candidates
 
         alphabet = self._ALPHABET
 
@@ -524,6 +527,33 @@ class Corrector:
 
             return {e2 for e1 in edits1(pairs) for e2 in sub_edits1(e1)}
 
+        e0 = edits0(word)  # | edits0(original_word)
+        candidates = [(c, EDIT_0_FACTOR) for c in known(e0)]
+        candidates.extend((c, EDIT_S_FACTOR) for c in known(self.subs(word)))
+        pairs = _splits(word)
+        e1 = edits1(pairs) - e0
+        candidates.extend((c, EDIT_1_FACTOR) for c in known(e1))
+        # The following edit distance=2 stuff is hugely expensive
+        # in terms of processor time and memory
+        # e2 = edits2(pairs) - e1 - e0
+        # candidates.extend((c, EDIT_2_FACTOR) for c in known(e2))
+        return candidates
+
+    def _correct(
+        self,
+        original_word: str,
+        word: str,
+        context: Tuple[str, ...],
+        at_sentence_start: bool,
+    ) -> str:
+        """ Find the best spelling correction for this word.
+            Credits for parts of this elegant code are due to Peter Norvig,
+            cf. http://nbviewer.jupyter.org/url/norvig.com/ipython/
+            How%20to%20Do%20Things%20with%20Words.ipynb """
+
+        # Note: word is assumed to be in lowercase, while
+        # original_word has the original case from the source text
+
         def gen_candidates(original_word: str, word: str) -> Iterable[Tuple[str, float]]:
             """ Generate candidates in order of generally decreasing likelihood """
 
@@ -586,20 +616,8 @@ class Corrector:
                     lamb += LOG_LAMBDA
 
             P = stupid_backoff
-            e0 = edits0(word)  # | edits0(original_word)
-            for c in known(e0):
-                yield (c, P(c) + EDIT_0_FACTOR)
-            for c in known(self.subs(word)):
-                yield (c, P(c) + EDIT_S_FACTOR)
-            pairs = _splits(word)
-            e1 = edits1(pairs) - e0
-            for c in known(e1):
-                yield (c, P(c) + EDIT_1_FACTOR)
-            # The following edit distance=2 stuff is hugely expensive
-            # in terms of processor time and memory
-            # e2 = edits2(pairs) - e1 - e0
-            # for c in known(e2):
-            #     yield (c, P(c) + EDIT_2_FACTOR)
+            for c, edit_factor in self._candidate_words(word):
+                yield (c, P(c) + edit_factor)
 
         # First, if the word itself is common enough as a unigram,
         # we don't bother checking it further and just assume it's fine
@@ -661,6 +679,10 @@ class Corrector:
 
     def is_rare(self, word: str, *, sentence_is_uppercase: bool=False) -> bool:
         """ Return True if the word is so rare as to be suspicious """
+        if not sentence_is_uppercase:
+            rare = self._rare.get(word)
+            if rare is not None:
+                return rare
         wl = word.lower()
         if wl != word:
             # The word is at least partially in uppercase in the text
@@ -677,6 +699,37 @@ class Corrector:
         # Return True if the lower case version is rare
         return self.logprob(wl) < self._RARE_THRESHOLD
 
+    def resolve(self, words: Iterable[str], unknown: Iterable[str] = ()) -> None:
+        """ Resolve a set of distinct word forms in bulk, typically all
+            word forms of a document, before the words are corrected.
+            The rarity of each word is looked up, and for rare words, as
+            well as words in the unknown set (which are not in BÍN),
+            the spelling correction candidates are generated. Subsequent
+            calls to is_rare() and correct() then only need to score the
+            candidates in their context. """
+        unknown = set(unknown)
+        for word in words:
+            if word in self._rare:
+                continue
+            if len(self._rare) >= self.MAX_VOCABULARY:
+                self.clear_vocabulary()
+            rare = self.is_rare(word)
+            self._rare[word] = rare
+            if rare or word in unknown:
+                cast_word = self._cast(word)
+                if cast_word not in self._candidates:
+                    self._candidates[cast_word] = self._candidate_words(cast_word)
+
+    @property
+    def vocabulary_size(self) -> int:
+        """ Return the number of word forms resolved by resolve() """
+        return len(self._rare)
+
+    def clear_vocabulary(self) -> None:
+        """ Discard word forms previously resolved by resolve() """
+        self._rare = dict()
+        self._candidates = dict()
+
     def correct(
         self,
         word: str,
@@ -0,0 +1,255 @@
+"""
+
+    Greynir: Natural language processing for Icelandic
+
+    Grammar check triage module
+
+    Copyright (C) 2020 Miðeind ehf.
+
+    This software is licensed under the MIT License:
+
+        Permission is hereby granted, free of charge, to any person
+        obtaining a copy of this software and associated documentation
+        files (the "Software"), to deal in the Software without restriction,
+        including without limitation the rights to use, copy, modify, merge,
+        publish, distribute, sublicense, and/or sell copies of the Software,
+        and to permit persons to whom the Software is furnished to do so,
+        subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be
+        included in all copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+        EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+        MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+        IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+        CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+        TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+        SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+    This module implements the GrammarTriage class, which is used in
+    checker.py to decide, before parsing a sentence, whether the parse
+    can give rise to any grammar annotations.
+
+    Most grammar annotations are only possible if particular words are
+    present in the sentence. PatternMatcher patterns have trigger lemmas,
+    ErrorFinder only checks the subjects of verbs listed in
+    VerbSubjects.VERBS_ERRORS, and most of the error-tagged nonterminals
+    in the grammar (Greynir.grammar) cannot be derived without matching
+    particular literal terminals. GrammarTriage collects these word forms
+    and lemmas (cues) along with the codes that they can lead to, and
+    looks them up in the tokens of a sentence.
+
+    Some codes, such as those of error-tagged nonterminals that only
+    consist of general terminals, have no cues. These are the open codes
+    of the triage, which cannot be predicted; neither can E001, the code
+    of sentences that cannot be parsed. Sentences are always parsed if
+    any open code is enabled, unless the caller chooses to skip them.
+    Since E001 is enabled by default, the triage does not skip any
+    sentence with the default codes unless the open codes are skipped.
+
+    Measured on the 248 sentences of the test suite (test_allkinds.py,
+    test_annotator.py and test_patterns.py), most of which contain
+    grammar errors, with all codes enabled and the open codes skipped:
+    a threshold of 1 skipped 31 sentences (13%) and kept 109 of the 114
+    grammar annotations (96% recall), losing two P_NT_FsMeðFallstjórn,
+    one P_NT_ÍTölu and one E001 (and one P_NT_EinnAf, whose span also
+    varied between runs without the triage). A threshold of 2
+    skipped 96 sentences (39%) with a recall of 70%. Without skipping the
+    open codes, no sentence was skipped. Texts with fewer errors have
+    fewer cues, so more of their sentences are skipped.
+
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from collections import defaultdict
+
+from tokenizer import Tok, TOK
+from reynir.grammar import Grammar, Nonterminal, Production
+from reynir.settings import VerbSubjects
+
+from .errtokenizer import CodeSet
+from .errfinder import ErrorFinder
+from .pattern import PatternMatcher
+
+
+# A set of word forms or lemmas, at least one of which is
+# found in any sentence where a particular nonterminal can be derived
+CueSet = FrozenSet[str]
+
+
+class GrammarTriage:
+
+    """ Decides whether the parse of a sentence can lead to grammar
+        annotations, by looking for cues in the tokens of the sentence """
+
+    def __init__(self, grammar: Grammar) -> None:
+        self._grammar = grammar
+        # Word forms and lemmas, mapped to the codes that they can lead to
+        self._cues: Dict[str, Set[str]] = defaultdict(set)
+        # Codes that are not predicted by any cue, including E001
+        # which is given to sentences that cannot be parsed
+        self._open: Set[str] = {"E001"}
+        self._add_pattern_cues()
+        self._add_verb_cues()
+        self._add_grammar_cues()
+
+    @property
+    def grammar(self) -> Grammar:
+        """ Return the grammar whose nonterminals the cues were found in """
+        return self._grammar
+
+    @property
+    def open_codes(self) -> FrozenSet[str]:
+        """ Return the codes that cannot be predicted by the triage """
+        return frozenset(self._open)
+
+    def _add_pattern_cues(self) -> None:
+        """ Add the trigger lemmas of the PatternMatcher patterns """
+        for trigger, _, _, _, code in PatternMatcher.patterns():
+            if not trigger:
+                # The pattern is applied to every sentence
+                self._open.add(code)
+                continue
+            for lemma in [trigger] if isinstance(trigger, str) else trigger:
+                self._cues[lemma].add(code)
+
+    def _add_verb_cues(self) -> None:
+        """ Add the verbs that ErrorFinder checks for wrong subject cases
+            and wrong impersonal forms """
+        for verb in VerbSubjects.VERBS_ERRORS:
+            self._cues[verb].add("P_WRONG_CASE_")
+        for form in getattr(ErrorFinder, "_NON_OP_VERB_FORMS"):
+            self._cues[form].add("P_WRONG_OP_FORM")
+
+    def _add_grammar_cues(self) -> None:
+        """ Add the literal terminals that are required for deriving
+            the error-tagged nonterminals of the grammar """
+        cues = self.nonterminal_cues(self._grammar)
+        for nt in self._grammar.nonterminals.values():
+            if not nt.has_tag("error"):
+                continue
+            code = ErrorFinder.nonterminal_code(nt.name)
+            cue = cues.get(nt)
+            if cue is None:
+                self._open.add(code)
+                continue
+            for word in cue:
+                self._cues[word].add(code)
+
+    @staticmethod
+    def nonterminal_cues(grammar: Grammar) -> Dict[Nonterminal, CueSet]:
+        """ Return a dict of the error-tagged nonterminals, and those that
+            can be derived from them, and their cue sets, i.e. sets of
+            literal terminals, one of which is matched in every derivation
+            of the nonterminal. Nonterminals that can be derived without
+            any literal terminals have no cue set. """
+        # Find the nonterminals that can be derived from the error-tagged ones
+        stack = [nt for nt in grammar.nonterminals.values() if nt.has_tag("error")]
+        nt_dict: Dict[Nonterminal, List[Tuple[int, Production]]] = dict()
+        while stack:
+            nt = stack.pop()
+            if nt in nt_dict:
+                continue
+            nt_dict[nt] = prods = grammar.nt_dict[nt]
+            stack.extend(
+                s for _, prod in prods for s in prod if isinstance(s, Nonterminal)
+            )
+        # Find the nonterminals that can be derived as empty
+        nullable: Set[Nonterminal] = set()
+        changed = True
+        while changed:
+            changed = False
+            for nt, prods in nt_dict.items():
+                if nt not in nullable and any(
+                    all(isinstance(s, Nonterminal) and s in nullable for s in prod)
+                    for _, prod in prods
+                ):
+                    nullable.add(nt)
+                    changed = True
+        cues: Dict[Nonterminal, CueSet] = dict()
+
+        def symbol_cue(s) -> Optional[CueSet]:
+            if isinstance(s, Nonterminal):
+                return None if s in nullable else cues.get(s)
+            if s.is_literal:
+                return frozenset((s.first,))
+            return None
+
+        # Iterate until no cue set can be narrowed down any further.
+        # A cue set is only replaced by a smaller one, so this terminates.
+        changed = True
+        while changed:
+            changed = False
+            for nt, prods in nt_dict.items():
+                cue: Set[str] = set()
+                for _, prod in prods:
+                    # Use the smallest cue set of the symbols of each
+                    # production; a production without one leaves the
+                    # nonterminal without a cue set
+                    best: Optional[CueSet] = None
+                    for s in prod:
+                        c = symbol_cue(s)
+                        if c is not None and (best is None or len(c) < len(best)):
+                            best = c
+                    if best is None:
+                        break
+                    cue |= best
+                else:
+                    old = cues.get(nt)
+                    if old is None or len(cue) < len(old):
+                        cues[nt] = frozenset(cue)
+                        changed = True
+        return cues
+
+    @staticmethod
+    def _token_keys(tokens: Iterable[Tok]) -> Set[str]:
+        """ Return the word forms and lemmas of the tokens """
+        keys: Set[str] = set()
+        for t in tokens:
+            if not t.txt:
+                continue
+            keys.add(t.txt.lower())
+            if t.kind == TOK.WORD and t.val:
+                for m in t.val:
+                    keys.add(m.stofn)
+                    # The pattern triggers are lemmas without hyphens
+                    keys.add(m.stofn.replace("-", ""))
+        return keys
+
+    def cued_codes(
+        self, tokens: Iterable[Tok], codes: Optional[CodeSet] = None
+    ) -> Set[str]:
+        """ Return the enabled codes whose cues are found in the tokens """
+        codes = codes or CodeSet()
+        cues = self._cues
+        found: Set[str] = set()
+        for key in self._token_keys(tokens):
+            found.update(cues.get(key, ()))
+        if codes.all:
+            return found
+        return {code for code in found if codes.any_enabled((code,))}
+
+    def worth_parsing(
+        self,
+        tokens: List[Tok],
+        codes: Optional[CodeSet] = None,
+        threshold: int = 1,
+        skip_open: bool = False,
+    ) -> bool:
+        """ Return True if the tokens contain cues for at least threshold
+            different enabled codes, or if any of the open codes is enabled,
+            cf. open_codes. A threshold of 1 never misses an annotation.
+            Higher thresholds skip the parse of more sentences, at the cost
+            of missing some annotations. If skip_open is True, the open
+            codes are disregarded, so annotations with them may be missed
+            even with a threshold of 1. """
+        if threshold <= 0:
+            return True
+        if not skip_open:
+            codes = codes or CodeSet()
+            if any(codes.enabled(code) for code in self._open):
+                return True
+        return len(self.cued_codes(tokens, codes)) >= threshold
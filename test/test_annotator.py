@@ -258,6 +258,24 @@ def test_foreign_sentences(rc):
         [(0, 7, "E004")],
         is_foreign=True
     )
+    # Foreign sentences are not parsed while E004 is being checked,
+    # even if the parser is asked to parse foreign sentences
+    gc = reynir_correct.GreynirCorrect(parse_foreign_sentences=True)
+    sent = gc.parse_single("Praise the Lord.")
+    assert sent.tree is None and sent.combinations == 0
+    assert [a.code for a in sent.annotations] == ["E004"]
+    stats = reynir_correct.check_with_stats(
+        "It was the best of times, it was the worst of times. Hann fór heim."
+    )
+    assert stats["num_foreign"] == 1
+    assert stats["num_foreign_tokens"] == 14
+    assert stats["foreign_parse_time_saved"] > 0.0
+    # With E004 disabled, foreign sentences are parsed instead of
+    # being annotated with E001
+    gc = reynir_correct.GreynirCorrect(codes=("E001", "P_NT_"))
+    sent = gc.parse_single("Praise the Lord.")
+    assert sent.tree is not None
+    assert not sent.annotations
 
 
 def test_number(rc):
@@ -295,6 +313,317 @@ def test_correct_sentences(rc):
     check_sentence(rc, "Ég hlakka til að sjá nýju Aliens-myndina.", [])
 
 
+def test_checker_session(rc):
+    session = reynir_correct.CheckerSession(two_pass=True)
+    # The module-level functions use the default session of the thread
+    assert reynir_correct.CheckerSession.get() is reynir_correct.CheckerSession.get()
+    s = "Mig dreimdi um ketti."
+    for _ in range(2):
+        sent = session.check_single(s)
+        assert sent is not None
+        assert any(a.code == "S004" and a.start == 1 for a in sent.annotations)
+        # The same Corrector, with its resolved vocabulary, is reused
+        assert session.corrector.vocabulary_size > 0
+    # The Corrector keeps its vocabulary within limits
+    corrector = session.corrector
+    corrector.MAX_VOCABULARY = 3
+    try:
+        corrector.resolve(["hestur", "köttur", "hundur", "mús", "fugl"])
+        assert 0 < corrector.vocabulary_size <= 3
+    finally:
+        del corrector.MAX_VOCABULARY
+    toks = list(session.tokenize(s))
+    assert toks[2].txt == "dreymdi"
+    stats = session.check_with_stats(s)
+    assert stats["num_sentences"] == 1
+
+
+def test_selective_codes(rc):
+    s = "Ég sá hann á Reykjavík í gær. Mig dreimdi um ketti."
+
+    def codes_of(codes):
+        return [
+            [(a.code, a.start) for a in sent.annotations]
+            for pg in reynir_correct.check(s, codes=codes)
+            for sent in pg
+        ]
+
+    assert codes_of(None) == [[("P_WRONG_PLACE_PP", 3)], [("S004", 1)]]
+    # The spelling profile skips parsing, and thus the grammar annotations
+    assert codes_of("spelling") == [[], [("S004", 1)]]
+    # Only grammar: the sentence is still corrected before it is parsed
+    assert codes_of("grammar") == [[("P_WRONG_PLACE_PP", 3)], []]
+    sent = reynir_correct.check_single("Mig dreimdi um ketti.", codes=["S"])
+    assert sent is not None and sent.tree is None
+    assert [a.code for a in sent.annotations] == ["S004"]
+    # Capitalization errors only: the spelling stages are skipped
+    toks = list(reynir_correct.tokenize("Mig dreimdi um ketti í Janúar.", codes="Z"))
+    assert toks[2].txt == "dreimdi"
+    assert [t.error_code for t in toks if t.error_code] == ["Z003"]
+    # Spelling-only mode: token-level errors and E004, without a parser
+    gc = reynir_correct.GreynirCorrect(parse=False)
+    assert not gc.parses and gc.reducer is None
+    sents = list(gc.submit(s + " Praise the Lord.", parse=True))
+    assert all(sent.tree is None for sent in sents)
+    assert [[a.code for a in sent.annotations] for sent in sents] == [
+        [], ["S004"], ["E004"]
+    ]
+    stats = reynir_correct.check_with_stats(s, parse=False)
+    assert stats["num_sentences"] == 2 and stats["num_parsed"] == 0
+
+    # Custom parser classes need not accept any arguments
+    class PlainCorrect(reynir_correct.GreynirCorrect):
+        def __init__(self) -> None:
+            super().__init__()
+
+    stats = reynir_correct.check_with_custom_parser(s, parser_class=PlainCorrect)
+    assert stats["num_sentences"] == 2 and stats["num_parsed"] == 2
+
+
+def test_parallel_check(rc):
+    s = (
+        "Ég sá hann á Reykjavík í gær. Mig dreimdi um ketti.\n"
+        "Hann fór heim. Hún fór fór út í búð.\n\n"
+        "Þetta er síðasta málsgreinin."
+    )
+
+    def summary(paragraphs):
+        return [
+            [
+                (sent.tidy_text, [(a.code, a.start, a.start_char, a.text) for a in ann])
+                for sent in pg
+                for ann in [sent.annotations]
+            ]
+            for pg in paragraphs
+        ]
+
+    serial = summary(reynir_correct.check(s, split_paragraphs=True))
+    assert len(serial) == 3
+    with reynir_correct.CheckerPool(2) as pool:
+        # Chunks of a single sentence are spread over the workers,
+        # but the results are returned in document order
+        parallel = summary(pool.check(s, split_paragraphs=True, chunk_sentences=1))
+        assert parallel == serial
+        parallel = summary(pool.check(s, split_paragraphs=True))
+        assert parallel == serial
+    # Options are passed on to the workers
+    checked = reynir_correct.check_parallel(
+        "Páli, vini mínum, langaði að horfa á sjónnvarpið.", processes=1, parse=False
+    )
+    assert [a.code for a in checked[0][0].annotations] == ["S004"]
+    # Parse the sentences in a pool of threads
+    threaded = reynir_correct.check_threaded(s, split_paragraphs=True, threads=3)
+    assert summary(threaded) == serial
+    assert threaded[0][0].tree is not None
+    # The sentences of a threaded job are only annotated once they have
+    # been parsed, and the parse statistics are collected under a lock
+    from concurrent.futures import ThreadPoolExecutor
+    from reynir_correct.checker import _ThreadedJob
+    from reynir import _Sentence
+    job = _ThreadedJob(rc, rc.tokenize(s))
+    sentences = list(job.sentences())
+    assert not any(hasattr(sent, "annotations") for sent in sentences)
+    with ThreadPoolExecutor(3) as executor:
+        list(executor.map(_Sentence.parse, sentences))
+    assert job.num_sentences == len(sentences) == 5
+    assert job.num_parsed == 5
+
+
+def test_parse_limits(rc):
+    s = "Mig dreimdi um ketti sem voru að leika sér í garðinum."
+    # A zero time budget causes every parse to be abandoned
+    session = reynir_correct.CheckerSession(parse_timeout=0.0)
+    sent = session.check_single(s)
+    assert sent is not None and sent.tree is None
+    # The token-level annotations are kept
+    assert [(a.code, a.start) for a in sent.annotations] == [("E005", 0), ("S004", 1)]
+    stats = session.check_with_stats(s + " " + s)
+    assert stats["num_sentences"] == 2
+    assert stats["num_timeouts"] == 2
+    # Abandoned parses don't affect later parses of the same tokens
+    sent = rc.parse_single(s)
+    assert sent.tree is not None
+    assert [a.code for a in sent.annotations] == ["S004"]
+    sent = reynir_correct.GreynirCorrect(parse_timeout=30.0).parse_single(s)
+    assert sent.tree is not None
+    # Only the tokens of parses with a time budget check the deadline
+    from reynir_correct.checker import (
+        ErrorDetectingParser, ErrorDetectionToken, _BudgetedToken, _parse_state
+    )
+    wrap = ErrorDetectingParser._create_wrapped_token
+    assert type(wrap(sent.tokens[0], 0)) is ErrorDetectionToken
+    _parse_state.deadline = 0.0
+    try:
+        token = wrap(sent.tokens[0], 0)
+    finally:
+        _parse_state.deadline = None
+    assert isinstance(token, _BudgetedToken)
+    # Don't reduce parse forests with too many combinations
+    stats = reynir_correct.CheckerSession(reduction_cap=5).check_with_stats(
+        s + " Hann fór heim."
+    )
+    assert stats["num_parsed"] == 1
+    assert stats["num_reduction_capped"] == 1
+    assert stats["peak_combinations"] > 5
+    capped, simple = stats["paragraphs"][0]
+    assert capped.tree is None and simple.tree is not None
+    assert [a.code for a in capped.annotations] == ["E005", "S004"]
+
+
+def test_threaded_parse_limits(rc):
+    from concurrent.futures import ThreadPoolExecutor
+
+    s = (
+        "Mig dreimdi um ketti sem voru að leika sér í garðinum. "
+        "Ég sá hann á Reykjavík í gær. Hann fór heim."
+    )
+
+    def summary(paragraphs):
+        return [
+            (sent.tree is not None, [(a.code, a.start) for a in sent.annotations])
+            for pg in paragraphs
+            for sent in pg
+        ]
+
+    expected = summary(reynir_correct.check(s))
+    # Parses that exceed their time budget run in threads alongside
+    # parses without one, and don't affect their token matching
+    session = reynir_correct.CheckerSession(parse_timeout=0.0)
+    for _ in range(3):
+        with ThreadPoolExecutor(2) as executor:
+            timed = executor.submit(session.check_threaded, s, threads=3)
+            plain = executor.submit(reynir_correct.check_threaded, s, threads=3)
+            assert summary(plain.result()) == expected
+            assert all(
+                not parsed and ("E005", 0) in ann
+                for parsed, ann in summary(timed.result())
+            )
+    assert summary(reynir_correct.check(s)) == expected
+    # Parses that finish in time add their matching results to the shared cache
+    parser = reynir_correct.GreynirCorrect._parser
+    cache = getattr(parser, "_shared_matching_cache")
+    size = len(cache)
+    session = reynir_correct.CheckerSession(parse_timeout=30.0)
+    assert summary(session.check_threaded("Gíraffarnir átu laufblöðin.")) == [
+        (True, [])
+    ]
+    assert len(cache) > size
+
+
+def test_chunked_parsing(rc):
+    from reynir_correct.checker import clause_chunks
+
+    s = (
+        "Ég sá hann á Reykjavík í gær og hann var glaður; hún fór heim til sín "
+        "eftir vinnu, en þau hittust seinna um kvöldið á kaffihúsi í miðbænum, "
+        "og þar ræddu þau lengi um lífið og tilveruna: Mig dreimdi um ketti sem "
+        "voru að leika sér í garðinum hjá okkur."
+    )
+    expected = [(3, 4, "P_WRONG_PLACE_PP"), (41, 41, "S004")]
+    check_sentence(rc, s, expected)
+    gc = reynir_correct.GreynirCorrect(chunk_tokens=20)
+    sent = gc.parse_single(s)
+    # The sentence is not parsed as a whole, but in three chunks, split
+    # at the semicolon and the colon, and the annotations of the chunks
+    # are mapped back to token indices within the sentence
+    assert sent.tree is None
+    assert clause_chunks(sent.tokens, 20) == [(0, 18), (19, 39), (40, 54)]
+    assert all(chunk.tree is not None for chunk in getattr(sent, "chunks"))
+    assert [(a.start, a.end, a.code) for a in sent.annotations] == expected
+    # With a time budget, the chunks share the deadline of the sentence
+    from reynir_correct.checker import _LimitedParser
+    deadlines = []
+    go_timed = _LimitedParser._go_timed
+
+    def record(self, tokens, root, deadline):
+        deadlines.append(deadline)
+        return go_timed(self, tokens, root, deadline)
+
+    setattr(_LimitedParser, "_go_timed", record)
+    try:
+        timed = reynir_correct.GreynirCorrect(chunk_tokens=20, parse_timeout=30.0)
+        sent = timed.parse_single(s)
+        assert [(a.start, a.end, a.code) for a in sent.annotations] == expected
+        assert len(deadlines) == 3 and len(set(deadlines)) == 1
+        # Sentences that are not chunked have deadlines of their own
+        del deadlines[:]
+        timed.parse_single("Ég sá hann á Reykjavík í gær.")
+        timed.parse_single("Ég sá hann á Reykjavík í gær.")
+        assert len(deadlines) == 2 and deadlines[0] < deadlines[1]
+    finally:
+        setattr(_LimitedParser, "_go_timed", go_timed)
+    # Chunks that are left without a budget are not parsed
+    sent = reynir_correct.GreynirCorrect(
+        chunk_tokens=20, parse_timeout=0.0
+    ).parse_single(s)
+    assert not any(chunk.tree for chunk in getattr(sent, "chunks"))
+    # Sentences below the threshold are parsed as usual
+    sent = gc.parse_single("Ég sá hann á Reykjavík í gær.")
+    assert sent.tree is not None and not hasattr(sent, "chunks")
+    # Commas are boundaries only if followed by a conjunction
+    toks = list(reynir_correct.tokenize("A, b, og c; d: e"))
+    toks = [t for t in toks if t.txt]
+    assert clause_chunks(toks, 1) == [(0, 3), (4, 6), (7, 8), (9, 10)]
+
+
+def test_grammar_triage(rc):
+    from reynir_correct.checker import TriageSkipError
+
+    s = "Ég sá hann á Reykjavík í gær. Hann fór heim. Fjöldi manna komu á fundinn."
+    # With the default codes, some enabled codes cannot be predicted,
+    # so all sentences are parsed
+    stats = reynir_correct.CheckerSession(triage=1).check_with_stats(s)
+    assert stats["num_parsed"] == 3 and stats["num_triaged"] == 0
+    session = reynir_correct.CheckerSession(triage=1, triage_skip_open=True)
+    stats = session.check_with_stats(s)
+    # The second sentence has no cues for grammar errors and is not parsed,
+    # but is not annotated as unparseable either
+    assert stats["num_parsed"] == 2 and stats["num_triaged"] == 1
+    first, second, third = stats["paragraphs"][0]
+    assert isinstance(second.error, TriageSkipError) and second.annotations == []
+    assert [a.code for a in first.annotations] == ["P_WRONG_PLACE_PP"]
+    assert [a.code for a in third.annotations] == ["P_NT_FjöldiHluti"]
+    # Only the cues of the enabled codes count
+    gc = reynir_correct.GreynirCorrect(triage=1, codes="P_WRONG_CASE_")
+    sent = gc.parse_single("Ég sá hann á Reykjavík í gær.")
+    assert sent.tree is None and sent.annotations == []
+    sent = gc.parse_single("Ég dreymdi um ketti.")
+    assert sent.tree is not None
+    assert [a.code for a in sent.annotations] == ["P_WRONG_CASE_nf_þf"]
+    # Error-tagged nonterminals without literal terminals cannot be predicted
+    triage = reynir_correct.GreynirCorrect._triage
+    assert "P_NT_FsMeðFallstjórn" in triage.open_codes
+    assert "E001" in triage.open_codes
+    assert "P_NT_FjöldiHluti" not in triage.open_codes
+
+
+def test_error_finder_pruning(rc):
+    from reynir_correct.errfinder import ErrorFinder, ErrorGrammarMap
+
+    sent = rc.parse_single("Fjöldi manna komu á fundinn og mig hlakkaði til.")
+    assert sent is not None and sent.deep_tree is not None
+    gmap = ErrorFinder._GRAMMAR_MAP
+    assert isinstance(gmap, ErrorGrammarMap)
+    assert gmap.includes(sent.deep_tree.nonterminal)
+
+    def annotations():
+        ann = []
+        ErrorFinder(ann, sent).go()
+        return sorted((a.start, a.end, a.code, a.text) for a in ann)
+
+    # The traversal is pruned using the grammar map, if it is available,
+    # with the same results as without it
+    pruned = annotations()
+    try:
+        ErrorFinder._GRAMMAR_MAP = None
+        assert annotations() == pruned
+    finally:
+        ErrorFinder._GRAMMAR_MAP = gmap
+    assert [code for _, _, code, _ in pruned] == [
+        "P_NT_FjöldiHluti", "P_WRONG_CASE_þf_nf"
+    ]
+
+
 if __name__ == "__main__":
 
     from reynir_correct import GreynirCorrect
@@ -306,3 +635,11 @@ if __name__ == "__main__":
     test_correct_sentences(gc)
     test_foreign_sentences(gc)
     test_number(gc)
+    test_checker_session(gc)
+    test_selective_codes(gc)
+    test_parallel_check(gc)
+    test_parse_limits(gc)
+    test_threaded_parse_limits(gc)
+    test_chunked_parsing(gc)
+    test_grammar_triage(gc)
+    test_error_finder_pruning(gc)
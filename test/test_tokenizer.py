@@ -33,8 +33,13 @@
 
 """
 
+import sys
+import json
+import subprocess
+
 import reynir_correct as rc
 import tokenizer
+from reynir import TOK
 
 
 def dump(tokens):
@@ -203,6 +208,35 @@ def test_split_compounds(verbose=False):
     assert "GRUNDVALLAR ATRIÐI" not in s
     assert "GRUNDVALLARATRIÐI" in s
 
+    # Split compounds are detected using pregenerated inflected forms
+    # of the latter parts
+    assert ("auka", "herbergjunum") in rc.settings.SplitCompounds.PAIRS
+    g = list(rc.tokenize("Ég fór inn í auka herbergjunum."))
+    if verbose: dump(g)
+    assert g[5].txt == "aukaherbergjunum"
+    assert g[5].error_code == "C003"
+
+
+def test_compound_cache(verbose=False):
+    from reynir_correct.errtokenizer import cached_compound_analysis
+    info = cached_compound_analysis.cache_info()
+    for _ in range(2):
+        g = list(rc.tokenize("Hann var feyknablíður í dag."))
+        if verbose: dump(g)
+        assert g[3].txt == "feiknablíður"
+        assert g[3].error_code == "C006"
+    assert cached_compound_analysis.cache_info().misses == info.misses + 1
+    assert cached_compound_analysis.cache_info().hits == info.hits + 1
+    # The BIN_Db instance is not a part of the cache key
+    from reynir.bindb import BIN_Db
+    from reynir_correct.errtokenizer import analyze_compound
+    for _ in range(2):
+        db = BIN_Db()
+        analyze_compound(db, "feyknablíðum", "feykna-blíður", False, False)
+        db.close()
+    assert cached_compound_analysis.cache_info().misses == info.misses + 2
+    assert cached_compound_analysis.cache_info().hits == info.hits + 2
+
 
 def test_unique_errors(verbose=False):
     """ Check unique_errors """
@@ -251,6 +285,31 @@ def test_unique_errors(verbose=False):
     assert g[10].val[0].stofn == "einhver"
     assert g[11].val[0].stofn == "lag"
 
+    # BÍN lookups of replacement words are stored with the rule,
+    # and the interned meaning list is shared between tokens
+    g1 = list(rc.tokenize("Hann veit ekki kvenær hún kemur."))
+    g2 = list(rc.tokenize("Hann veit ekki kvenær hún kemur."))
+    assert g1[4].txt == "hvenær"
+    assert ("hvenær", False) in rc.settings.UniqueErrors.LOOKUPS
+    assert g1[4].val is g2[4].val
+    # Identical words share their meaning lists and strings
+    assert g1[1].val is g2[1].val
+    assert g1[1].txt is g2[1].txt
+    assert g1[1].val[0].stofn is g2[1].val[0].stofn
+    # The lookup caches don't keep BIN_Db instances alive
+    import gc
+    from weakref import ref
+    from reynir.bindb import BIN_Db
+    from reynir_correct.errtokenizer import analyze_compound, lookup_interned
+    db = BIN_Db()
+    db_ref = ref(db)
+    assert lookup_interned(db, "hvenær") is lookup_interned(db, "hvenær")
+    analyze_compound(db, "feyknablíðum", "feykna-blíður", False, False)
+    db.close()
+    del db
+    gc.collect()
+    assert db_ref() is None
+
 
 def test_error_forms(verbose=False):
     """ Check error_forms """
@@ -362,6 +421,23 @@ def test_capitalization_errors(verbose=False):
     assert "þriðja Júlí" not in s
     assert "þriðja júlí" in s
 
+    # Inflected forms of wrongly capitalized stems are corrected,
+    # while correctly capitalized forms are left alone
+    g = list(rc.tokenize("Hann er Danskari en hún."))
+    if verbose: dump(g)
+    assert g[3].txt == "danskari"
+    assert g[3].error_code == "Z001"
+    g = list(rc.tokenize("Hann er danskari en hún."))
+    if verbose: dump(g)
+    assert g[3].txt == "danskari"
+    assert not g[3].error_code.startswith("Z")
+    g = list(rc.tokenize("Hún hitti íslendingana en ekki Íslendinganna."))
+    if verbose: dump(g)
+    assert g[3].txt == "Íslendingana"
+    assert g[3].error_code == "Z002"
+    assert g[6].txt == "Íslendinganna"
+    assert not g[6].error_code
+
 
 def test_capitalization_of_numbers(verbose=False):
     g = rc.tokenize("Fjögur hundruð manns komu saman í dag.")
@@ -494,6 +570,66 @@ def test_taboo_words(verbose=False):
         else:
             assert not g[ix].error_code
 
+    # Taboo words are recognized in all their inflected forms
+    g = list(rc.tokenize("Lessurnar sáu surtinum bregða fyrir."))
+    if verbose: dump(g)
+    assert g[1].error_code == "T001/w"
+    assert g[3].error_code == "T001/w"
+    # Forms of compounds that are not in BÍN are generated from the last part
+    from reynir.bindb import BIN_Db
+    from reynir_correct.errtokenizer import inflected_forms
+    with BIN_Db.get_db() as db:
+        forms = inflected_forms(db, "ofurnegri")
+    assert "ofurnegrunum" in forms
+
+    # Verbs have no listed forms, so verbs sharing their infinitive
+    # with a taboo word are not flagged, while the noun still is
+    g = list(rc.tokenize("Hún pussaði bílinn en pussan var hrein."))
+    if verbose: dump(g)
+    assert g[2].txt == "pussaði" and g[2].error_code != "T001/w"
+    assert g[5].txt == "pussan" and g[5].error_code == "T001/w"
+
+
+def test_bin_internals(verbose=False):
+    """ inflected_forms() reads the inflected forms of BÍN stems from the
+        internals of reynir's BIN_Compressed class, which are not a part of
+        its public API. Where they are missing, the checks fall back to
+        looking up the meanings of each word. """
+    from reynir.bindb import BIN_Db
+    from reynir_correct.errtokenizer import (
+        TabooWords, check_taboo_batch, compressed_bin, inflected_forms, taboo_forms
+    )
+    with BIN_Db.get_db() as db:
+        assert compressed_bin(db) is not None
+        forms = inflected_forms(db, "hestur")
+        tokens = list(rc.tokenize("Lessurnar hlupu."))
+    for t in tokens:
+        t.set_error(None)
+
+    class NoInternals:
+        _compressed_bin = None
+
+    nodb = NoInternals()
+    assert compressed_bin(nodb) is None
+    assert inflected_forms(nodb, "hestur") is None
+    saved = TabooWords.FORMS
+    TabooWords.FORMS = None
+    try:
+        assert taboo_forms(nodb) is None
+        # The fallback is not cached
+        assert TabooWords.FORMS is None
+        checked = check_taboo_batch(tokens, nodb)
+    finally:
+        TabooWords.FORMS = saved
+    assert checked[1].error_code == "T001/w"
+    assert not checked[2].error_code
+    assert forms == {
+        "hestur", "hest", "hesti", "hests",
+        "hesturinn", "hestinn", "hestinum", "hestsins",
+        "hestar", "hesta", "hestum",
+        "hestarnir", "hestana", "hestunum", "hestanna",
+    }
+
 
 def test_multiword_errors(verbose=False):
     sent = """
@@ -550,6 +686,207 @@ def test_complex(verbose=False):
     assert "örfá" in s
 
 
+def test_error_descriptions(verbose=False):
+    g = rc.tokenize("Ég fór niðrá bryggjuna með með Reyni í gær.")
+    g = list(g)
+    if verbose: dump(g)
+    descriptions = [t.error_description for t in g if t.error_code]
+    assert "Orðinu 'niðrá' var skipt upp" in descriptions
+    assert "'með' er að öllum líkindum ofaukið" in descriptions
+    # Descriptions are rendered from a template and its arguments
+    err = rc.errtokenizer.CompoundError("004", "'{0}' er ofaukið", args=("með",))
+    assert err.description == "'með' er ofaukið"
+    assert err.to_dict() == {"code": "C004/w", "descr": "'með' er ofaukið"}
+    # Errors dumped before templates were introduced have no arguments
+    old = rc.errtokenizer.CorrectToken.load(
+        TOK.WORD, "með", [], "CompoundError",
+        {"_code": "C001", "_span": 1, "_txt": "Endurtekið orð ('með') var fellt burt"},
+    )
+    assert old.error_description == "Endurtekið orð ('með') var fellt burt"
+    # Annotation texts may also be given lazily
+    ann = rc.Annotation(start=0, end=0, code="C004/w", text=lambda: err.description)
+    assert ann.text == "'með' er ofaukið"
+
+
+def test_ci_only_pipeline(verbose=False):
+    g = rc.tokenize_ci("Ég fór niðrá bryggjuna með með Reyni og vakknaði snemma.")
+    g = list(g)
+    if verbose: dump(g)
+    codes = {t.txt: t.error_code for t in g if t.error_code}
+    assert codes == {"niður": "C002", "vakknaði": "U001"}
+    # The lightweight pipeline must never import the n-gram model
+    code = (
+        "import sys, reynir_correct as rc;"
+        "list(rc.tokenize_ci('Hann vakknaði snemma.'));"
+        "assert 'icegrams' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_rule_index():
+    from reynir_correct.errtokenizer import RuleIndex
+    assert RuleIndex.lookup("hestur") == 0
+    assert RuleIndex.lookup("") == 0
+    assert RuleIndex.lookup("Amk.") == RuleIndex.WRONG_ABBREV
+    assert RuleIndex.lookup("kvenær") == RuleIndex.UNIQUE_ERROR
+    # Unique errors are matched in their original case only
+    assert RuleIndex.lookup("Kvenær") == 0
+    # Wrong compounds are matched in lower case
+    assert RuleIndex.lookup("niðrá") == RuleIndex.WRONG_COMPOUND
+    assert RuleIndex.lookup("NIÐRÁ") == RuleIndex.WRONG_COMPOUND
+    # The index is rebuilt when a correction table is modified
+    from reynir_correct.settings import Settings, UniqueErrors
+    assert RuleIndex.lookup("hestir") == 0
+    UniqueErrors.add("hestir", ("hestar",))
+    try:
+        assert RuleIndex.lookup("hestir") == RuleIndex.UNIQUE_ERROR
+    finally:
+        del UniqueErrors.DICT["hestir"]
+        Settings.modified()
+    assert RuleIndex.lookup("hestir") == 0
+
+
+def test_two_pass(verbose=False):
+    s = (
+        "Hvað attu við með þessu? Kannski leikskola fyrir öll börn. "
+        "Hvað attu við? Þetta eru aðeins örfa dæmi um leikskola."
+    )
+    g1 = list(rc.tokenize(s))
+    g2 = list(rc.tokenize(s, two_pass=True))
+    if verbose: dump(g2)
+    assert [(t.txt, t.error_code) for t in g1] == [(t.txt, t.error_code) for t in g2]
+    s = gen_to_string(g2)
+    assert "attu" not in s
+    assert s.count("áttu") == 2
+    assert "leikskóla" in s
+    assert "örfá" in s
+
+
+def test_batch_stages(verbose=False):
+    from reynir_correct.errtokenizer import batch_adapter, sentence_batches
+
+    seen = []
+    taboo = []
+
+    def count_sentence(tokens):
+        seen.append(len(tokens))
+        return tokens
+
+    def find_taboo(token_stream):
+        for token in token_stream:
+            if token.error_code == "T001/w":
+                taboo.append(token.txt)
+            yield token
+
+    class MyPipeline(rc.CorrectionPipeline):
+        def batch_stages(self):
+            return super().batch_stages() + [
+                count_sentence, batch_adapter(find_taboo)
+            ]
+
+    s = "Hann er negri. Hún er það ekki."
+    g = list(MyPipeline(s).tokenize())
+    if verbose: dump(g)
+    assert seen == [6, 7]
+    # The taboo word check is run before the added stages
+    assert taboo == ["negri"]
+    assert [len(b) for b in sentence_batches(g)] == seen
+    assert [(t.txt, t.error_code) for t in g] == [
+        (t.txt, t.error_code) for t in rc.tokenize(s)
+    ]
+
+
+def test_char_offsets(verbose=False):
+    s = "Ég fór fór  heim að sama skapi með 500 Milljónir krónur, kvenær?"
+    g = list(rc.tokenize(s))
+    if verbose: dump(g)
+    spans = [(t.txt, s[t.char_start : t.char_end]) for t in g if t.txt]
+    assert spans == [
+        ("Ég", "Ég"),
+        ("fór", "fór fór"),  # The duplicate word was removed
+        ("heim", "heim"),
+        ("að sama skapi", "að sama skapi"),
+        ("með", "með"),
+        ("500 milljónir krónur", "500 Milljónir krónur"),
+        (",", ","),
+        ("hvenær", "kvenær"),
+        ("?", "?"),
+    ]
+    # Annotations carry the character span of the annotated tokens
+    sent = rc.check_single("Mig dreimdi  um ketti.")
+    a = next(a for a in sent.annotations if a.code == "S004")
+    assert (a.start_char, a.end_char) == (4, 11)
+
+
+def test_error_flyweights(verbose=False):
+    g = list(rc.tokenize("Ég fór með með honum og með með henni."))
+    if verbose: dump(g)
+    errs = [t.error for t in g if t.error_code]
+    assert len(errs) == 2
+    # Identical errors are shared between tokens
+    assert errs[0] is errs[1]
+    assert not hasattr(errs[0], "__dict__")
+    assert not hasattr(rc.Annotation(start=0, end=0, code="X", text=""), "__dict__")
+    # Serialization round trip
+    CorrectToken = rc.errtokenizer.CorrectToken
+    t = next(t for t in g if t.error_code)
+    d = CorrectToken.dump(t)
+    assert d[4]["_code"] == "C004/w"
+    t2 = CorrectToken.load(*json.loads(json.dumps(d)))
+    assert t2 == t
+    assert t2.error is t.error
+    # Tokens that share an error are unaffected by the deprecated set_span(),
+    # which returns a new error instead of modifying the shared one
+    t1, t2 = [t for t in g if t.error_code]
+    assert t1.error is t2.error
+    import warnings
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        wider = t1.error.set_span(2)
+    assert w[0].category is DeprecationWarning
+    assert wider.span == 2 and wider is t1.error.with_span(2)
+    assert t1.error.span == 1 and t2.error.span == 1
+    t1.set_error(wider)
+    assert t1.error_span == 2 and t2.error_span == 1
+
+
+def test_token_rules(verbose=False):
+    engine = rc.TokenRuleEngine()
+    called = []
+
+    @engine.rule("R001", forms=["Alltaf"])
+    def always(tokens, ix):
+        called.append(tokens[ix].txt)
+        return rc.RuleError("R001", "Betra væri '{0}'", args=("ávallt",))
+
+    @engine.rule("R002", lemmas=["köttur"])
+    def cat_after_um(tokens, ix):
+        called.append(tokens[ix].txt)
+        if ix > 0 and tokens[ix - 1].txt == "um":
+            return rc.RuleError("R002", "Köttur", is_warning=True)
+        return None
+
+    # Add many rules that are never triggered by the sentences below
+    for i in range(500):
+        code = "R9{0:03}".format(i)
+        engine.add(rc.TokenRule(code, always, forms=["x{0}".format(i)]))
+    assert len(engine) == 502
+
+    s = "Mig dreymdi alltaf um ketti. Kettir eru alltaf bestir."
+    g = list(rc.tokenize(s, rules=engine))
+    if verbose: dump(g)
+    errors = [(t.txt, t.error_code) for t in g if t.error_code]
+    assert errors == [("alltaf", "R001"), ("ketti", "R002/w"), ("alltaf", "R001")]
+    assert g[3].error_description == "Betra væri 'ávallt'"
+    # Rules are only run on their trigger tokens
+    assert called == ["alltaf", "ketti", "Kettir", "alltaf"]
+    # Rules with disabled codes are not run
+    del called[:]
+    g = list(rc.tokenize(s, rules=engine, codes=["R002"]))
+    assert called == ["ketti", "Kettir"]
+    assert [t.error_code for t in g if t.error_code] == ["R002/w"]
+
+
 if __name__ == "__main__":
 
     test_correct(verbose=True)